@@ -2,242 +2,454 @@
 """
 Script to import product details from a JSON file.
 """
-import os
-import sys
 import json
 import re
+import io
+import csv
+import logging
 import argparse
 from datetime import datetime
 
-# Add the parent directory to sys.path to import app modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-
-from app.database import SessionLocal, engine, Base
-from app.models import Product, ProductNutritionalDetail
+import psycopg2.extras
+
+try:
+    import ijson
+except ImportError:
+    # Fall back to loading the whole file when ijson is unavailable
+    ijson = None
+
+from app.database import Base, create_all_if_not_exists
+from db_utils import get_connection
+
+# Logging setup is the entry point's job (see __main__ below); per-row
+# messages are DEBUG so large imports don't pay a stdout flush per item
+logger = logging.getLogger(__name__)
+
+# Column order for the bulk upsert into product_nutritional_details.
+# Must match the tuples built in import_product_details.
+PND_COLUMNS = (
+    "product_id",
+
+    # Source information
+    "source_region",
+    "source_wikipedia",
+    "source_url",
+    "manufacturing_process",
+
+    # Research papers as simple array of links
+    "research_papers",
+
+    # Nutrition data
+    "calories", "calories_unit",
+    "protein", "protein_unit",
+    "carbohydrates", "carbohydrates_unit",
+    "total_fat", "total_fat_unit",
+    "fiber", "fiber_unit",
+    "sugar", "sugar_unit",
+    "sodium", "sodium_unit",
+
+    # Additional minerals
+    "potassium", "potassium_unit",
+    "calcium", "calcium_unit",
+    "iron", "iron_unit",
+    "magnesium", "magnesium_unit",
+    "phosphorus", "phosphorus_unit",
+    "zinc", "zinc_unit",
+
+    # Vitamins
+    "vitamin_a", "vitamin_a_unit",
+    "vitamin_c", "vitamin_c_unit",
+    "vitamin_d", "vitamin_d_unit",
+    "vitamin_e", "vitamin_e_unit",
+    "vitamin_k", "vitamin_k_unit",
+    "thiamin", "thiamin_unit",
+    "riboflavin", "riboflavin_unit",
+    "niacin", "niacin_unit",
+    "vitamin_b6", "vitamin_b6_unit",
+    "folate", "folate_unit",
+    "vitamin_b12", "vitamin_b12_unit",
+
+    # Additional nutritional information
+    "glycemic_index",
+    "antioxidants",
+    "allergens",
+
+    # Fats breakdown
+    "saturated_fat", "saturated_fat_unit",
+    "monounsaturated_fat", "monounsaturated_fat_unit",
+    "polyunsaturated_fat", "polyunsaturated_fat_unit",
+    "trans_fat", "trans_fat_unit",
+    "cholesterol", "cholesterol_unit",
+
+    # Carbs breakdown
+    "dietary_fiber", "dietary_fiber_unit",
+    "soluble_fiber", "soluble_fiber_unit",
+    "insoluble_fiber", "insoluble_fiber_unit",
+
+    # Units of measurement
+    "serving_size",
+    "serving_unit",
+
+    # Additional information
+    "notes",
+    "health_benefits",
+    "contraindications",
+
+    # Metadata
+    "created_at",
+    "updated_at",
+)
+
+# Column name → tuple position, for patching computed fields into rows
+_PND_INDEX = {col: i for i, col in enumerate(PND_COLUMNS)}
+
+# Upsert statement for execute_values. COALESCE keeps existing values when
+# the incoming row has NULL for a field, preserving the old behavior of
+# never overwriting existing data with None.
+PND_UPSERT_SQL = (
+    "INSERT INTO product_nutritional_details ({cols}) VALUES %s "
+    "ON CONFLICT (product_id) DO UPDATE SET {updates}, updated_at = EXCLUDED.updated_at"
+).format(
+    cols=", ".join(PND_COLUMNS),
+    updates=", ".join(
+        f"{c} = COALESCE(EXCLUDED.{c}, product_nutritional_details.{c})"
+        for c in PND_COLUMNS
+        if c not in ("product_id", "created_at", "updated_at")
+    ),
+)
+
+# Insert rows in pages of this size to bound memory per round-trip
+UPSERT_PAGE_SIZE = 500
+
+# Commit after this many rows so one bad row only costs its own batch
+BATCH_SIZE = 200
+
+# Array-typed columns that need PostgreSQL array literals in the COPY stream
+PND_ARRAY_COLUMNS = (
+    "source_wikipedia",
+    "research_papers",
+    "allergens",
+    "health_benefits",
+    "contraindications",
+)
+
+
+def pg_array_literal(values):
+    """Encode a Python list as a PostgreSQL array literal for COPY."""
+    if values is None:
+        return None
+    parts = []
+    for value in values:
+        if value is None:
+            parts.append("NULL")
+        else:
+            escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+            parts.append(f'"{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def copy_product_details(cursor, rows):
+    """Stream rows into product_nutritional_details via COPY FROM STDIN.
+
+    COPY skips per-row parse/plan overhead, so it is much faster than
+    INSERTs for initial loads. Callers drop the product_id unique index
+    before the load and recreate it afterwards so index maintenance
+    happens once in bulk.
+    """
+    array_indexes = {PND_COLUMNS.index(col) for col in PND_ARRAY_COLUMNS}
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([
+            pg_array_literal(value) if i in array_indexes else value
+            for i, value in enumerate(row)
+        ])
+    buf.seek(0)
+
+    cursor.copy_expert(
+        "COPY product_nutritional_details ({cols}) FROM STDIN WITH (FORMAT csv)".format(
+            cols=", ".join(PND_COLUMNS)
+        ),
+        buf,
+    )
+
+
+# Compiled once at module level so per-URL calls skip re-compilation
+_MD_URL_RE = re.compile(r'\]\((.*?)\)')
 
 
 def extract_url(markdown_url):
     """Extract URL from markdown format: [text](url)"""
     if not markdown_url:
         return None
-    url_match = re.search(r'\]\((.*?)\)', markdown_url)
+    url_match = _MD_URL_RE.search(markdown_url)
     if url_match:
         return url_match.group(1)
     return markdown_url
 
 
-def import_product_details(json_file_path):
-    """Import product details from a JSON file."""
-    # Create tables if they don't exist
-    Base.metadata.create_all(bind=engine)
-
-    # Open database session
-    db = SessionLocal()
-
-    try:
-        # Load JSON data
-        print(f"Loading data from {json_file_path}...")
+def extract_urls(markdown_urls):
+    """Extract URLs from a list of markdown-format links in one pass.
+
+    Dispatches the compiled pattern over the whole list with map() instead
+    of re-entering extract_url per element; entries that are not markdown
+    links fall back to the raw string, same as extract_url.
+    """
+    present = [url for url in markdown_urls if url]
+    return [
+        match.group(1) if match else url
+        for url, match in zip(present, map(_MD_URL_RE.search, present))
+    ]
+
+
+def build_detail_row(item, product_id, now_iso):
+    """Build one tuple in PND_COLUMNS order for a JSON item."""
+    # Process URLs in source_wikipedia and research_papers
+    source_wikipedia_urls = None
+    if isinstance(item.get("source_wikipedia"), list):
+        source_wikipedia_urls = extract_urls(item.get("source_wikipedia"))
+
+    research_paper_urls = None
+    if isinstance(item.get("research_papers"), list):
+        research_paper_urls = extract_urls(item.get("research_papers"))
+
+    # Extract URL from source_url if it's in markdown format
+    source_url = None
+    if item.get("source_url"):
+        source_url = extract_url(item.get("source_url"))
+
+    # Convert string fields to arrays for database compatibility
+    health_benefits = item.get("health_benefits")
+    if health_benefits and isinstance(health_benefits, str):
+        health_benefits = [health_benefits]
+
+    contraindications = item.get("contraindications")
+    if contraindications and isinstance(contraindications, str):
+        contraindications = [contraindications]
+
+    # Fill the row positionally from the static column list, then patch in
+    # the handful of computed fields — no per-row dict round-trip
+    row = [item.get(col) for col in PND_COLUMNS]
+    row[_PND_INDEX["product_id"]] = product_id
+    row[_PND_INDEX["source_wikipedia"]] = source_wikipedia_urls
+    row[_PND_INDEX["source_url"]] = source_url
+    row[_PND_INDEX["research_papers"]] = research_paper_urls
+    row[_PND_INDEX["health_benefits"]] = health_benefits
+    row[_PND_INDEX["contraindications"]] = contraindications
+    row[_PND_INDEX["created_at"]] = now_iso
+    row[_PND_INDEX["updated_at"]] = now_iso
+    return tuple(row)
+
+
+def upsert_in_batches(conn, cursor, rows):
+    """Upsert rows in committed batches of BATCH_SIZE.
+
+    Committing per batch instead of per row avoids a WAL fsync per item
+    while still bounding how much work a failure can lose. When a batch
+    fails it is rolled back and replayed one row at a time so only the
+    truly bad rows are skipped.
+
+    Returns a (written, failed) tuple.
+    """
+    written = 0
+    failed = 0
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        try:
+            psycopg2.extras.execute_values(
+                cursor, PND_UPSERT_SQL, batch, page_size=UPSERT_PAGE_SIZE
+            )
+            conn.commit()
+            written += len(batch)
+        except Exception as e:
+            conn.rollback()
+            logger.warning("Batch starting at row %d failed (%s); replaying individually", start, e)
+            for row in batch:
+                try:
+                    psycopg2.extras.execute_values(cursor, PND_UPSERT_SQL, [row])
+                    conn.commit()
+                    written += 1
+                except Exception as row_error:
+                    conn.rollback()
+                    logger.error("Error upserting row for product_id %s: %s", row[0], row_error)
+                    failed += 1
+    return written, failed
+
+
+def iter_json_items(json_file_path):
+    """Yield product items one at a time.
+
+    Streams the top-level array with ijson when available so memory stays
+    O(batch) for large backfill files; otherwise loads the file in one go.
+    """
+    if ijson is not None:
+        with open(json_file_path, 'rb') as file:
+            yield from ijson.items(file, 'item')
+    else:
         with open(json_file_path, 'r') as file:
-            data = json.load(file)
-
-        print(f"Found {len(data)} product details to import.")
+            yield from json.load(file)
+
+
+def resolve_and_build(cursor, items, now_iso):
+    """Resolve slugs for a batch of items and build their row tuples.
+
+    Returns a (rows, skipped) tuple.
+    """
+    slugs = [item.get("slug") for item in items if item.get("slug")]
+    slug_to_id = {}
+    if slugs:
+        cursor.execute("SELECT id, slug FROM products WHERE slug = ANY(%s)", (slugs,))
+        slug_to_id = {slug: product_id for product_id, slug in cursor.fetchall()}
+
+    rows = []
+    skipped = 0
+    for item in items:
+        slug = item.get("slug")
+        if not slug:
+            logger.debug("Skipping item without slug")
+            skipped += 1
+            continue
+
+        product_id = slug_to_id.get(slug)
+        if not product_id:
+            logger.debug("Skipping unknown product slug: %s", slug)
+            skipped += 1
+            continue
+
+        try:
+            rows.append(build_detail_row(item, product_id, now_iso))
+        except Exception:
+            logger.exception("Error processing item with slug %s", slug)
+            skipped += 1
+            continue
+    return rows, skipped
+
+
+def import_product_details(json_file_path, initial_load=False):
+    """Import product details from a JSON file using a bulk upsert.
+
+    Items are streamed from the file in batches of BATCH_SIZE: each batch
+    resolves its slugs with a single SELECT, then writes its rows with one
+    execute_values upsert — instead of ~3 round-trips and a transaction
+    per item. Streaming keeps memory flat and overlaps JSON parsing with
+    the database writes.
+
+    With initial_load=True and an empty target table, batches are streamed
+    via COPY FROM STDIN instead, the fastest bulk-load path.
+    """
+    # Create tables if they don't exist (one batched IF NOT EXISTS pass)
+    create_all_if_not_exists(Base.metadata)
+
+    # Raw psycopg2 connection from the pooled engine for the bulk path;
+    # get_connection also lifts the API statement_timeout, which a large
+    # COPY or upsert batch would otherwise trip
+    conn = get_connection()
 
-        total_imported = 0
+    try:
+        logger.info("Loading data from %s...", json_file_path)
+
+        cursor = conn.cursor()
+
+        # COPY fast path for initial loads, execute_values upsert otherwise
+        use_copy = False
+        if initial_load:
+            cursor.execute("SELECT NOT EXISTS (SELECT 1 FROM product_nutritional_details)")
+            use_copy = cursor.fetchone()[0]
+        if use_copy:
+            # Drop the unique index once up front; recreated after the load
+            cursor.execute("DROP INDEX IF EXISTS idx_pnd_product_id")
+        else:
+            # ON CONFLICT (product_id) needs a unique index to arbitrate.
+            # Tables created before the model gained unique=True don't
+            # have one, so add it here; the guard skips tables where a
+            # unique index on product_id (constraint-backed or ours)
+            # already exists.
+            cursor.execute("""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (
+                        SELECT 1 FROM pg_index i
+                        JOIN pg_class t ON t.oid = i.indrelid
+                        WHERE t.relname = 'product_nutritional_details'
+                          AND i.indisunique
+                          AND i.indnkeyatts = 1
+                          AND (SELECT attname FROM pg_attribute
+                               WHERE attrelid = t.oid
+                                 AND attnum = i.indkey[0]) = 'product_id'
+                    ) THEN
+                        CREATE UNIQUE INDEX idx_pnd_product_id
+                            ON product_nutritional_details (product_id);
+                    END IF;
+                END $$
+            """)
+            conn.commit()
+
+        now_iso = datetime.utcnow().isoformat()
         total_skipped = 0
-        total_updated = 0
-
-        for item in data:
-            try:
-                # Check for required fields
-                slug = item.get("slug")
-                if not slug:
-                    print(f"Skipping item without slug")
-                    total_skipped += 1
-                    continue
-
-                # Find the product by slug
-                product = db.query(Product).filter(Product.slug == slug).first()
-                if not product:
-                    print(f"Skipping unknown product slug: {slug}")
-                    total_skipped += 1
-                    continue
-
-                # Check if product detail already exists
-                existing_detail = db.query(ProductNutritionalDetail).filter(
-                    ProductNutritionalDetail.product_id == product.id
-                ).first()
-
-                # Process URLs in source_wikipedia and research_papers
-                source_wikipedia_urls = []
-                if isinstance(item.get("source_wikipedia"), list):
-                    source_wikipedia_urls = [extract_url(url) for url in item.get("source_wikipedia") if url]
-
-                research_paper_urls = []
-                if isinstance(item.get("research_papers"), list):
-                    research_paper_urls = [extract_url(url) for url in item.get("research_papers") if url]
-
-                # Extract URL from source_url if it's in markdown format
-                source_url = None
-                if item.get("source_url"):
-                    source_url = extract_url(item.get("source_url"))
-
-                # Convert string fields to arrays for database compatibility
-                health_benefits = item.get("health_benefits")
-                if health_benefits and isinstance(health_benefits, str):
-                    health_benefits = [health_benefits]
-
-                contraindications = item.get("contraindications")
-                if contraindications and isinstance(contraindications, str):
-                    contraindications = [contraindications]
-
-                # Map fields with values and units separately
-                detail_data = {
-                    "product_id": product.id,
-
-                    # Source information
-                    "source_region": item.get("source_region"),
-                    "source_wikipedia": source_wikipedia_urls,
-                    "source_url": source_url,
-                    "manufacturing_process": item.get("manufacturing_process"),
-
-                    # Handle research papers as simple array of links
-                    "research_papers": research_paper_urls,
-
-                    # Nutrition data
-                    "calories": item.get("calories"),
-                    "calories_unit": item.get("calories_unit"),
-                    "protein": item.get("protein"),
-                    "protein_unit": item.get("protein_unit"),
-                    "carbohydrates": item.get("carbohydrates"),
-                    "carbohydrates_unit": item.get("carbohydrates_unit"),
-                    "total_fat": item.get("total_fat"),
-                    "total_fat_unit": item.get("total_fat_unit"),
-                    "fiber": item.get("fiber"),
-                    "fiber_unit": item.get("fiber_unit"),
-                    "sugar": item.get("sugar"),
-                    "sugar_unit": item.get("sugar_unit"),
-                    "sodium": item.get("sodium"),
-                    "sodium_unit": item.get("sodium_unit"),
-
-                    # Additional minerals
-                    "potassium": item.get("potassium"),
-                    "potassium_unit": item.get("potassium_unit"),
-                    "calcium": item.get("calcium"),
-                    "calcium_unit": item.get("calcium_unit"),
-                    "iron": item.get("iron"),
-                    "iron_unit": item.get("iron_unit"),
-                    "magnesium": item.get("magnesium"),
-                    "magnesium_unit": item.get("magnesium_unit"),
-                    "phosphorus": item.get("phosphorus"),
-                    "phosphorus_unit": item.get("phosphorus_unit"),
-                    "zinc": item.get("zinc"),
-                    "zinc_unit": item.get("zinc_unit"),
-
-                    # Vitamins
-                    "vitamin_a": item.get("vitamin_a"),
-                    "vitamin_a_unit": item.get("vitamin_a_unit"),
-                    "vitamin_c": item.get("vitamin_c"),
-                    "vitamin_c_unit": item.get("vitamin_c_unit"),
-                    "vitamin_d": item.get("vitamin_d"),
-                    "vitamin_d_unit": item.get("vitamin_d_unit"),
-                    "vitamin_e": item.get("vitamin_e"),
-                    "vitamin_e_unit": item.get("vitamin_e_unit"),
-                    "vitamin_k": item.get("vitamin_k"),
-                    "vitamin_k_unit": item.get("vitamin_k_unit"),
-                    "thiamin": item.get("thiamin"),
-                    "thiamin_unit": item.get("thiamin_unit"),
-                    "riboflavin": item.get("riboflavin"),
-                    "riboflavin_unit": item.get("riboflavin_unit"),
-                    "niacin": item.get("niacin"),
-                    "niacin_unit": item.get("niacin_unit"),
-                    "vitamin_b6": item.get("vitamin_b6"),
-                    "vitamin_b6_unit": item.get("vitamin_b6_unit"),
-                    "folate": item.get("folate"),
-                    "folate_unit": item.get("folate_unit"),
-                    "vitamin_b12": item.get("vitamin_b12"),
-                    "vitamin_b12_unit": item.get("vitamin_b12_unit"),
-
-                    # Additional nutritional information
-                    "glycemic_index": item.get("glycemic_index"),
-                    "antioxidants": item.get("antioxidants"),
-                    "allergens": item.get("allergens"),
-
-                    # Additional fields for fats breakdown
-                    "saturated_fat": item.get("saturated_fat"),
-                    "saturated_fat_unit": item.get("saturated_fat_unit"),
-                    "monounsaturated_fat": item.get("monounsaturated_fat"),
-                    "monounsaturated_fat_unit": item.get("monounsaturated_fat_unit"),
-                    "polyunsaturated_fat": item.get("polyunsaturated_fat"),
-                    "polyunsaturated_fat_unit": item.get("polyunsaturated_fat_unit"),
-                    "trans_fat": item.get("trans_fat"),
-                    "trans_fat_unit": item.get("trans_fat_unit"),
-                    "cholesterol": item.get("cholesterol"),
-                    "cholesterol_unit": item.get("cholesterol_unit"),
-
-                    # Additional fields for carbs breakdown
-                    "dietary_fiber": item.get("dietary_fiber"),
-                    "dietary_fiber_unit": item.get("dietary_fiber_unit"),
-                    "soluble_fiber": item.get("soluble_fiber"),
-                    "soluble_fiber_unit": item.get("soluble_fiber_unit"),
-                    "insoluble_fiber": item.get("insoluble_fiber"),
-                    "insoluble_fiber_unit": item.get("insoluble_fiber_unit"),
-
-                    # Units of measurement
-                    "serving_size": item.get("serving_size"),
-                    "serving_unit": item.get("serving_unit"),
-
-                    # Additional information - convert strings to arrays for database compatibility
-                    "notes": item.get("notes"),
-                    "health_benefits": health_benefits,
-                    "contraindications": contraindications,
-                }
-
-                # Remove None values to avoid overwriting existing data with None
-                detail_data = {k: v for k, v in detail_data.items() if v is not None}
-
-                if existing_detail:
-                    # Update existing detail
-                    for key, value in detail_data.items():
-                        setattr(existing_detail, key, value)
-
-                    existing_detail.updated_at = datetime.utcnow().isoformat()
-                    total_updated += 1
-                    print(f"Updated details for product: {slug}")
-                else:
-                    # Create new detail
-                    db_detail = ProductNutritionalDetail(**detail_data)
-                    db.add(db_detail)
-                    total_imported += 1
-                    print(f"Imported details for product: {slug}")
-
-                # Commit after each product to avoid losing all data if an error occurs
-                db.commit()
-
-            except Exception as e:
-                db.rollback()
-                print(f"Error processing item with slug {item.get('slug', 'unknown')}: {e}")
-                import traceback
-                traceback.print_exc()
-                total_skipped += 1
-                # Continue with the next item instead of failing the entire import
-                continue
-
-        print(
-            f"Import completed. Total products: imported={total_imported}, updated={total_updated}, skipped={total_skipped}")
-
-    except Exception as e:
-        db.rollback()
-        print(f"Error importing data: {e}")
-        import traceback
-        traceback.print_exc()
+        written = 0
+
+        def write_batch(items):
+            nonlocal written, total_skipped
+            rows, skipped = resolve_and_build(cursor, items, now_iso)
+            total_skipped += skipped
+            if not rows:
+                return
+            if use_copy:
+                copy_product_details(cursor, rows)
+                conn.commit()
+                written += len(rows)
+            else:
+                batch_written, failed = upsert_in_batches(conn, cursor, rows)
+                written += batch_written
+                total_skipped += failed
+
+        batch = []
+        for item in iter_json_items(json_file_path):
+            batch.append(item)
+            if len(batch) >= BATCH_SIZE:
+                write_batch(batch)
+                batch = []
+        if batch:
+            write_batch(batch)
+
+        if use_copy:
+            cursor.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_pnd_product_id "
+                "ON product_nutritional_details (product_id)"
+            )
+        conn.commit()
+        cursor.close()
+
+        mode = "copied" if use_copy else "upserted"
+        logger.info(
+            "Import completed. Total products: %s=%d, skipped=%d", mode, written, total_skipped)
+
+    except Exception:
+        conn.rollback()
+        logger.exception("Error importing data")
     finally:
-        db.close()
+        conn.close()
 
 def main():
     """Main function to parse command-line arguments and run the import."""
-
-    import_product_details("/Users/pradeep/Library/Application Support/JetBrains/PyCharm2024.3/scratches/scratch.json")
+    parser = argparse.ArgumentParser(description="Import product details from a JSON file")
+    parser.add_argument(
+        "json_file",
+        nargs="?",
+        default="/Users/pradeep/Library/Application Support/JetBrains/PyCharm2024.3/scratches/scratch.json",
+        help="Path to the JSON file to import",
+    )
+    parser.add_argument(
+        "--initial-load",
+        action="store_true",
+        help="Use COPY FROM STDIN when the target table is empty (fastest bulk load)",
+    )
+    args = parser.parse_args()
+
+    import_product_details(args.json_file, initial_load=args.initial_load)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -2,53 +2,61 @@
 """
 Script to add default payment methods to the database
 """
-import sys
-import os
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+import logging
 
-# Add the parent directory to sys.path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import psycopg2
 
-from app.database import SessionLocal, engine
-from app.models import PaymentMethod, PaymentMethodType
+from db_utils import get_connection
 
-def add_default_payment_methods():
-    """Add default payment methods to the database"""
-    db = SessionLocal()
+# Logging setup is the entry point's job; configuring it at import time
+# would install duplicate handlers when several scripts run together
+logger = logging.getLogger(__name__)
+
+# SQLAlchemy's Enum(PaymentMethodType) stores the enum *name*, so the
+# raw insert must use 'COD' (not the 'cash_on_delivery' value)
+INSERT_COD_SQL = """
+    INSERT INTO payment_methods (user_id, method_type, provider, is_default, is_active)
+    SELECT NULL, 'COD', 'Cash on Delivery', TRUE, TRUE
+    WHERE NOT EXISTS (
+        SELECT 1 FROM payment_methods
+        WHERE method_type = 'COD' AND provider = 'Cash on Delivery'
+    )
+"""
+
+def add_default_payment_methods(conn=None):
+    """Add default payment methods to the database.
+
+    A single idempotent INSERT ... WHERE NOT EXISTS replaces the old
+    ORM session + SELECT + INSERT round-trips. Reuses the given psycopg2
+    connection when provided (e.g. from bootstrap.py); otherwise opens
+    and closes its own.
+    """
+    own_conn = conn is None
     try:
-        # Check if Cash on Delivery payment method already exists
-        existing_cod = db.query(PaymentMethod).filter(
-            PaymentMethod.method_type == PaymentMethodType.COD,
-            PaymentMethod.provider == "Cash on Delivery"
-        ).first()
-        
-        if not existing_cod:
-            # Add Cash on Delivery payment method
-            cod_payment_method = PaymentMethod(
-                user_id=None,  # System-wide payment method, not tied to a specific user
-                method_type=PaymentMethodType.COD,
-                provider="Cash on Delivery",
-                is_default=True,
-                is_active=True
-            )
-            db.add(cod_payment_method)
-            db.commit()
-            print("Cash on Delivery payment method added successfully")
+        if own_conn:
+            conn = get_connection()
+
+        cursor = conn.cursor()
+        cursor.execute(INSERT_COD_SQL)
+        if cursor.rowcount:
+            logger.info("Cash on Delivery payment method added successfully")
         else:
-            print("Cash on Delivery payment method already exists")
-            
+            logger.info("Cash on Delivery payment method already exists")
+        conn.commit()
+        cursor.close()
+
         # You can add more default payment methods here if needed
-        
-    except IntegrityError as e:
-        db.rollback()
-        print(f"Error adding payment methods: {e}")
+
+        if own_conn:
+            conn.close()
+        return True
     except Exception as e:
-        db.rollback()
-        print(f"Unexpected error: {e}")
-    finally:
-        db.close()
+        if conn is not None:
+            conn.rollback()
+        logger.error(f"Error adding payment methods: {e}")
+        return False
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     add_default_payment_methods()
-    print("Payment methods setup complete")
+    logger.info("Payment methods setup complete")
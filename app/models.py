@@ -1,11 +1,12 @@
 from typing import Optional, List, Dict
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, Float, DateTime, Enum, Table, JSON, Date, \
-    ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, SmallInteger, String, Text, Float, Numeric, DateTime, \
+    Enum, Table, Date, ARRAY, CHAR, Index, text, Computed
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 import enum
-from datetime import datetime, date
 
 from .database import Base
 
@@ -105,10 +106,16 @@ class Document(Base):
     verified_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     verification_date = Column(DateTime(timezone=True), nullable=True)
     expiry_date = Column(DateTime(timezone=True), nullable=True)  # For documents with expiry
-    doc_metadata = Column(JSON, nullable=True)  # Additional metadata - renamed from metadata
+    doc_metadata = Column(JSONB, nullable=True)  # Additional metadata - renamed from metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Most documents are unverified at any time; index only the verified
+    # minority that the compliance lookups filter for
+    __table_args__ = (
+        Index("ix_documents_verified", "user_id", postgresql_where=text("is_verified")),
+    )
+
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
     verifier = relationship("User", foreign_keys=[verified_by])
@@ -125,43 +132,95 @@ product_category = Table(
     Column("category_id", Integer, ForeignKey("categories.id"), primary_key=True)
 )
 
+# Bit positions inside Product.flags. Six separate Boolean columns cost a
+# byte each plus alignment per tuple; one smallint holds them all and lets
+# combined filters ("featured or bestseller") run as a single integer AND.
+FLAG_BESTSELLER = 1 << 0
+FLAG_NEW = 1 << 1
+FLAG_FEATURED = 1 << 2
+FLAG_TOP_SELLER = 1 << 3
+FLAG_TOP_PRODUCT = 1 << 4
+FLAG_POPULAR = 1 << 5
+
+_PRODUCT_FLAG_BITS = {
+    "is_bestseller": FLAG_BESTSELLER,
+    "is_new": FLAG_NEW,
+    "is_featured": FLAG_FEATURED,
+    "is_top_seller": FLAG_TOP_SELLER,
+    "is_top_product": FLAG_TOP_PRODUCT,
+    "is_popular": FLAG_POPULAR,
+}
+
+def _flag_property(bit):
+    """Expose one bit of Product.flags under the old boolean attribute name.
+
+    Reads, writes and query expressions all keep working
+    (Product.is_featured == True compiles to flags & bit <> 0), so the
+    API surface is unchanged while the row stores a single smallint.
+    """
+    def getter(self):
+        return bool((self.flags or 0) & bit)
+
+    def setter(self, value):
+        if value:
+            self.flags = (self.flags or 0) | bit
+        else:
+            self.flags = (self.flags or 0) & ~bit
+
+    def expression(cls):
+        return cls.flags.op("&")(bit) != 0
+
+    return hybrid_property(getter, setter, expr=expression)
+
 class Product(Base):
     __tablename__ = "products"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
-    slug = Column(String, unique=True, index=True)
-    sku = Column(String, unique=True, index=True)
-    description = Column(Text)
-    description_hi = Column(Text, nullable=True)
-    base_price = Column(Float)  # Base price before margin
-    price = Column(Float)  # Final price after margin
+    slug = Column(String(200), unique=True, index=True)
+    sku = Column(String(64), unique=True, index=True)
+    # The "content" group defers the TOAST-heavy blobs: cart, checkout and
+    # search load dense Product rows (price, stock, flags) without
+    # dragging the long text/JSONB payloads through the buffer cache.
+    # Endpoints that render them opt back in with undefer_group("content").
+    description = deferred(Column(Text), group="content")
+    description_hi = deferred(Column(Text, nullable=True), group="content")
+    base_price = Column(Numeric(12, 2))  # Base price before margin
+    price = Column(Numeric(12, 2))  # Final price after margin
     stock_quantity = Column(Integer, default=0)
-    image_urls = Column(Text)  # Stored as JSON string
+    image_urls = deferred(Column(JSONB, nullable=True), group="content")  # JSON array of image URLs
     seller_id = Column(Integer, ForeignKey("users.id"))
-    hsn_code = Column(String, nullable=True)  # HSN code for GST classification
-    tax_rate = Column(Float, default=0.0)  # Default tax rate for the product
+    hsn_code = Column(String(8), nullable=True)  # HSN code for GST classification
+    tax_rate = Column(Numeric(5, 2), default=0.0)  # Default tax rate for the product
     is_tax_inclusive = Column(Boolean, default=False)  # Whether price includes tax
-    gst_details = Column(JSON, nullable=True)  # JSON with GST details
-    features = Column(JSON, nullable=True)  # JSON array of feature strings
-    specifications = Column(JSON, nullable=True)  # JSON array of specification objects
-    approval_status = Column(Enum(ApprovalStatus), default=ApprovalStatus.PENDING)
+    gst_details = deferred(Column(JSONB, nullable=True), group="content")  # JSON with GST details
+    features = deferred(Column(JSONB, nullable=True), group="content")  # JSON array of feature strings
+    specifications = deferred(Column(JSONB, nullable=True), group="content")  # JSON array of specification objects
+    approval_status = Column(Enum(ApprovalStatus), default=ApprovalStatus.PENDING, index=True)
     approved_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    is_bestseller = Column(Boolean, default=False,nullable=True)
-    is_new = Column(Boolean, default=False,nullable=True)
-    is_featured = Column(Boolean, default=False,nullable=True) 
-    is_top_seller = Column(Boolean, default=False,nullable=True) 
-    is_top_product = Column(Boolean, default=False,nullable=True) 
-    is_popular  = Column(Boolean, default=False,nullable=True) 
+    flags = Column(SmallInteger, nullable=False, default=0, server_default=text("0"))
+    is_bestseller = _flag_property(FLAG_BESTSELLER)
+    is_new = _flag_property(FLAG_NEW)
+    is_featured = _flag_property(FLAG_FEATURED)
+    is_top_seller = _flag_property(FLAG_TOP_SELLER)
+    is_top_product = _flag_property(FLAG_TOP_PRODUCT)
+    is_popular = _flag_property(FLAG_POPULAR)
+
+    def flag_values(self):
+        """Expand flags into the six boolean API fields for serialization."""
+        return {name: bool((self.flags or 0) & bit) for name, bit in _PRODUCT_FLAG_BITS.items()}
 
     # Relationships
     seller = relationship("User", back_populates="products", foreign_keys=[seller_id])
     approver = relationship("User", foreign_keys=[approved_by])
-    categories = relationship("Category", secondary=product_category, back_populates="products")
-    cart_items = relationship("CartItem", back_populates="product")
-    documents = relationship("Document", back_populates="product")
+    # selectin: listing endpoints iterate products and touch these
+    # collections, so one batched WHERE product_id IN (...) query per
+    # collection replaces a lazy query per row (N+1)
+    categories = relationship("Category", secondary=product_category, back_populates="products", lazy="selectin")
+    cart_items = relationship("CartItem", back_populates="product", lazy="raise_on_sql")
+    documents = relationship("Document", back_populates="product", lazy="selectin")
     product_detail = relationship("ProductDetailContent", back_populates="product", uselist=False)
     nutritional_details = relationship("ProductNutritionalDetail", back_populates="product", uselist=False)
 
@@ -171,7 +230,7 @@ class ProductNutritionalDetail(Base):
     __tablename__ = "product_nutritional_details"
 
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, unique=True)
 
     # Source information
     source_region = Column(Text, nullable=True)
@@ -298,9 +357,8 @@ class ProductNutritionalDetail(Base):
     contraindications = Column(Text, nullable=True)
 
     # Metadata
-    created_at = Column(String, default=lambda: datetime.utcnow().isoformat())
-    updated_at = Column(String, default=lambda: datetime.utcnow().isoformat(),
-                        onupdate=lambda: datetime.utcnow().isoformat())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationship
     product = relationship("Product", back_populates="nutritional_details")
@@ -308,30 +366,34 @@ class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True)
-    username = Column(String, unique=True, index=True)
+    email = Column(String(254), unique=True, index=True)
+    username = Column(String(64), unique=True, index=True)
     hashed_password = Column(String)
     full_name = Column(String)
-    phone = Column(String)
+    phone = Column(String(20))
     role = Column(Enum(UserRole), default=UserRole.BUYER)
     is_active = Column(Boolean, default=True)
     # Business details for sellers
     business_name = Column(String, nullable=True)
-    business_address = Column(Text, nullable=True)  # JSON string for address
-    gst_number = Column(String, nullable=True)  # GST registration number
-    pan_number = Column(String, nullable=True)  # PAN card number
+    business_address = Column(JSONB, nullable=True)  # Address object
+    # Fixed-format statutory codes: CHAR compares as plain memcmp
+    gst_number = Column(CHAR(15), nullable=True)  # GST registration number
+    pan_number = Column(CHAR(10), nullable=True)  # PAN card number
     tax_identification_number = Column(String, nullable=True)  # TIN for tax purposes
-    bank_details = Column(JSON, nullable=True)  # Bank account details for payments
+    bank_details = Column(JSONB, nullable=True)  # Bank account details for payments
     region = Column(String, nullable=True)  # State/region for tax calculation
-    meta_data = Column(JSON, nullable=True)  # Additional metadata
+    meta_data = Column(JSONB, nullable=True)  # Additional metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    products = relationship("Product", back_populates="seller", foreign_keys=[Product.seller_id])
-    cart_items = relationship("CartItem", back_populates="user")
-    orders = relationship("Order", back_populates="user")
-    documents = relationship("Document", foreign_keys=[Document.user_id], back_populates="user")
+    # raise_on_sql: these collections can hold thousands of rows per
+    # user; no endpoint walks them today, so any future lazy load is a
+    # bug surfaced immediately — opt in with selectinload() at the query
+    products = relationship("Product", back_populates="seller", foreign_keys=[Product.seller_id], lazy="raise_on_sql")
+    cart_items = relationship("CartItem", back_populates="user", lazy="raise_on_sql")
+    orders = relationship("Order", back_populates="user", lazy="raise_on_sql")
+    documents = relationship("Document", foreign_keys=[Document.user_id], back_populates="user", lazy="raise_on_sql")
     certifications = relationship("Certification", back_populates="user")
     awards = relationship("Award", back_populates="user")
     testimonials = relationship("Testimonial", back_populates="user")
@@ -371,6 +433,11 @@ class CartItem(Base):
     user = relationship("User", back_populates="cart_items")
     product = relationship("Product", back_populates="cart_items")
 
+    # Cart lookups are always by user, often probing for one product
+    __table_args__ = (
+        Index("ix_cart_items_user_product", "user_id", "product_id"),
+    )
+
 
 class ProductDetailContent(Base):
     __tablename__ = "product_details_content"
@@ -416,26 +483,31 @@ class Order(Base):
     __tablename__ = "orders"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_number = Column(String, unique=True, index=True)
+    order_number = Column(String(32), unique=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    subtotal_amount = Column(Float)  # Sum of item prices before tax
-    total_amount = Column(Float)  # Final amount including tax and shipping
-    tax_amount = Column(Float)  # Total tax amount
-    cgst_amount = Column(Float, default=0.0)  # Central GST amount
-    sgst_amount = Column(Float, default=0.0)  # State GST amount
-    igst_amount = Column(Float, default=0.0)  # Integrated GST amount
-    shipping_amount = Column(Float)
-    discount_amount = Column(Float, default=0.0)  # Total discount applied
-    status = Column(Enum(OrderStatus), default=OrderStatus.PENDING)
-    payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING)
+    subtotal_amount = Column(Numeric(12, 2))  # Sum of item prices before tax
+    total_amount = Column(Numeric(12, 2))  # Final amount including tax and shipping
+    tax_amount = Column(Numeric(12, 2))  # Total tax amount
+    cgst_amount = Column(Numeric(12, 2), default=0.0)  # Central GST amount
+    sgst_amount = Column(Numeric(12, 2), default=0.0)  # State GST amount
+    igst_amount = Column(Numeric(12, 2), default=0.0)  # Integrated GST amount
+    shipping_amount = Column(Numeric(12, 2))
+    discount_amount = Column(Numeric(12, 2), default=0.0)  # Total discount applied
+    status = Column(Enum(OrderStatus), default=OrderStatus.PENDING, index=True)
+    payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING, index=True)
     payment_method = Column(String)
-    payment_details = Column(Text, nullable=True)  # JSON string for payment details
-    shipping_address = Column(Text)  # JSON string for address
-    billing_address = Column(Text)  # JSON string for billing address
+    payment_details = Column(JSONB, nullable=True)  # Payment details object
+    # FKs to the saved addresses these snapshots came from; listings can
+    # join user_addresses instead of parsing the JSONB blobs, while the
+    # JSONB columns stay as the immutable at-order-time snapshot
+    shipping_address_id = Column(Integer, ForeignKey("user_addresses.id"), nullable=True)
+    billing_address_id = Column(Integer, ForeignKey("user_addresses.id"), nullable=True)
+    shipping_address = Column(JSONB)  # Address snapshot at order time
+    billing_address = Column(JSONB)  # Billing address snapshot at order time
     shipping_method = Column(String)
     tracking_number = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
-    invoice_number = Column(String, nullable=True)  # Invoice number for tax purposes
+    invoice_number = Column(String(32), nullable=True)  # Invoice number for tax purposes
     invoice_date = Column(DateTime(timezone=True), nullable=True)
     invoice_url = Column(String, nullable=True)  # URL to the generated invoice
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -443,8 +515,10 @@ class Order(Base):
 
     # Relationships
     user = relationship("User")
-    items = relationship("OrderItem", back_populates="order")
-    documents = relationship("Document", back_populates="order")
+    # Order history endpoints always render items; selectin fetches the
+    # whole page of children in one extra query instead of one per order
+    items = relationship("OrderItem", back_populates="order", lazy="selectin")
+    documents = relationship("Document", back_populates="order", lazy="selectin")
 
 
 class OrderItem(Base):
@@ -455,10 +529,12 @@ class OrderItem(Base):
     product_id = Column(Integer, ForeignKey("products.id"))
     seller_id = Column(Integer, ForeignKey("users.id"))
     quantity = Column(Integer)
-    price = Column(Float)  # Price at the time of purchase
-    total = Column(Float)  # price * quantity
-    tax_amount = Column(Float, default=0.0)  # Total tax amount for this item
-    gst_details = Column(JSON, nullable=True)  # JSON with GST breakdown (CGST, SGST, IGST)
+    price = Column(Numeric(12, 2))  # Price at the time of purchase
+    # GENERATED ALWAYS: the server computes and stores the line total, so
+    # insert payloads can't drift out of sync with price/quantity
+    total = Column(Numeric(12, 2), Computed("price * quantity", persisted=True))
+    tax_amount = Column(Numeric(12, 2), default=0.0)  # Total tax amount for this item
+    gst_details = Column(JSONB, nullable=True)  # JSON with GST breakdown (CGST, SGST, IGST)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -466,13 +542,24 @@ class OrderItem(Base):
     product = relationship("Product")
     seller = relationship("User")
 
+    # Covers the order-detail join; INCLUDE makes quantity/price/total
+    # reads index-only scans on PG11+
+    __table_args__ = (
+        Index(
+            "ix_order_items_order_product",
+            "order_id",
+            "product_id",
+            postgresql_include=["quantity", "price", "total"],
+        ),
+    )
+
 
 class TaxRate(Base):
     __tablename__ = "tax_rates"
     
     id = Column(Integer, primary_key=True, index=True)
     tax_type = Column(Enum(TaxType))
-    rate = Column(Float)  # Percentage value (e.g., 18.0 for 18%)
+    rate = Column(Numeric(5, 2))  # Percentage value (e.g., 18.0 for 18%)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)  # For category-specific tax rates
     region = Column(String, nullable=True)  # For region-specific tax rates (state code)
     is_active = Column(Boolean, default=True)
@@ -484,12 +571,17 @@ class TaxRate(Base):
     # Relationships
     category = relationship("Category")
 
+    # Tax resolution filters on all three in one query
+    __table_args__ = (
+        Index("ix_tax_rates_lookup", "category_id", "region", "is_active"),
+    )
+
 
 class MarginSetting(Base):
     __tablename__ = "margin_settings"
     
     id = Column(Integer, primary_key=True, index=True)
-    margin_percentage = Column(Float)  # Percentage value (e.g., 15.0 for 15%)
+    margin_percentage = Column(Numeric(5, 2))  # Percentage value (e.g., 15.0 for 15%)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=True)  # For product-specific margins
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)  # For category-specific margins
     seller_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # For seller-specific margins
@@ -518,7 +610,11 @@ class Certification(Base):
     is_verified = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    
+
+    __table_args__ = (
+        Index("ix_certifications_verified", "user_id", postgresql_where=text("is_verified")),
+    )
+
     # Relationships
     document = relationship("Document")
     user = relationship("User")
@@ -553,6 +649,12 @@ class PaymentMethod(Base):
     is_default = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
     last_used = Column(DateTime(timezone=True), nullable=True)
+
+    # Checkout resolves "the user's default active method"; only one row
+    # per user matches, so the partial index stays tiny
+    __table_args__ = (
+        Index("ix_payment_methods_default", "user_id", postgresql_where=text("is_default AND is_active")),
+    )
     
     # For cards
     card_last_four = Column(String(4), nullable=True)
@@ -577,7 +679,7 @@ class PaymentMethod(Base):
     token_expiry = Column(DateTime(timezone=True), nullable=True)
     
     # Metadata
-    payment_metadata = Column(JSON, nullable=True)  # Additional provider-specific details - renamed from metadata
+    payment_metadata = Column(JSONB, nullable=True)  # Additional provider-specific details - renamed from metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -590,12 +692,12 @@ class Payment(Base):
     __tablename__ = "payments"
     
     id = Column(Integer, primary_key=True, index=True)
-    payment_reference = Column(String, unique=True, index=True)  # Unique reference number
+    payment_reference = Column(String(64), unique=True, index=True)  # Unique reference number
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)  # Can be null for non-order payments
     user_id = Column(Integer, ForeignKey("users.id"))
     payment_method_id = Column(Integer, ForeignKey("payment_methods.id"), nullable=True)
-    amount = Column(Float)  # Total payment amount
-    currency = Column(String, default="INR")
+    amount = Column(Numeric(12, 2))  # Total payment amount
+    currency = Column(CHAR(3), default="INR")
     status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING)
     payment_date = Column(DateTime(timezone=True), nullable=True)  # When payment was completed
     due_date = Column(DateTime(timezone=True), nullable=True)  # For scheduled payments
@@ -604,7 +706,7 @@ class Payment(Base):
     # Payment gateway details
     gateway = Column(String, nullable=True)  # e.g., Razorpay, Stripe
     gateway_payment_id = Column(String, nullable=True)  # ID from payment gateway
-    gateway_response = Column(JSON, nullable=True)  # Full response from gateway
+    gateway_response = Column(JSONB, nullable=True)  # Full response from gateway
     gateway_order_id = Column(String, nullable=True)
     # For installment payments
     is_installment = Column(Boolean, default=False)
@@ -617,11 +719,11 @@ class Payment(Base):
     next_payment_date = Column(DateTime(timezone=True), nullable=True)
     
     # For refunds
-    refunded_amount = Column(Float, default=0.0)
+    refunded_amount = Column(Numeric(12, 2), default=0.0)
     refund_reason = Column(Text, nullable=True)
     
     # Metadata
-    payment_metadata = Column(JSON, nullable=True)  # Additional payment details - renamed from metadata
+    payment_metadata = Column(JSONB, nullable=True)  # Additional payment details - renamed from metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -632,6 +734,11 @@ class Payment(Base):
     transactions = relationship("Transaction", back_populates="payment")
     invoices = relationship("Invoice", secondary="invoice_payments", back_populates="payments")
 
+    # "my payments by status" listing filter
+    __table_args__ = (
+        Index("ix_payments_user_status", "user_id", "status"),
+    )
+
 
 class InstallmentPlan(Base):
     __tablename__ = "installment_plans"
@@ -639,11 +746,11 @@ class InstallmentPlan(Base):
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
-    total_amount = Column(Float)  # Total amount to be paid
+    total_amount = Column(Numeric(12, 2))  # Total amount to be paid
     number_of_installments = Column(Integer)
     installment_frequency = Column(String)  # e.g., "monthly", "weekly"
-    interest_rate = Column(Float, default=0.0)  # Annual interest rate
-    processing_fee = Column(Float, default=0.0)  # One-time fee
+    interest_rate = Column(Numeric(5, 2), default=0.0)  # Annual interest rate
+    processing_fee = Column(Numeric(12, 2), default=0.0)  # One-time fee
     start_date = Column(DateTime(timezone=True))
     end_date = Column(DateTime(timezone=True), nullable=True)
     status = Column(String, default="active")  # active, completed, defaulted
@@ -660,18 +767,18 @@ class Transaction(Base):
     __tablename__ = "transactions"
     
     id = Column(Integer, primary_key=True, index=True)
-    transaction_reference = Column(String, unique=True, index=True)
+    transaction_reference = Column(String(64), unique=True, index=True)
     payment_id = Column(Integer, ForeignKey("payments.id"), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     transaction_type = Column(Enum(TransactionType))
-    amount = Column(Float)
-    currency = Column(String, default="INR")
+    amount = Column(Numeric(12, 2))
+    currency = Column(CHAR(3), default="INR")
     status = Column(String)  # success, failed, pending
     gateway = Column(String, nullable=True)
     gateway_transaction_id = Column(String, nullable=True)
-    gateway_response = Column(JSON, nullable=True)
+    gateway_response = Column(JSONB, nullable=True)
     description = Column(Text, nullable=True)
-    transaction_metadata = Column(JSON, nullable=True)  # Additional metadata - renamed from metadata
+    transaction_metadata = Column(JSONB, nullable=True)  # Additional metadata - renamed from metadata
     transaction_date = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -684,7 +791,7 @@ class Invoice(Base):
     __tablename__ = "invoices"
     
     id = Column(Integer, primary_key=True, index=True)
-    invoice_number = Column(String, unique=True, index=True)
+    invoice_number = Column(String(32), unique=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)  # Can be null for non-order invoices
     user_id = Column(Integer, ForeignKey("users.id"))  # Customer
     seller_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Seller if applicable
@@ -695,21 +802,23 @@ class Invoice(Base):
     status = Column(Enum(InvoiceStatus), default=InvoiceStatus.DRAFT)
     
     # Financial details
-    subtotal = Column(Float)  # Sum of line items before tax
-    tax_amount = Column(Float)  # Total tax amount
-    cgst_amount = Column(Float, default=0.0)  # Central GST amount
-    sgst_amount = Column(Float, default=0.0)  # State GST amount
-    igst_amount = Column(Float, default=0.0)  # Integrated GST amount
-    discount_amount = Column(Float, default=0.0)  # Total discount applied
-    shipping_amount = Column(Float, default=0.0)  # Shipping charges
-    adjustment_amount = Column(Float, default=0.0)  # Any other adjustments
-    total_amount = Column(Float)  # Final amount including all taxes and charges
-    amount_paid = Column(Float, default=0.0)  # Amount already paid
-    amount_due = Column(Float)  # Remaining amount to be paid
+    subtotal = Column(Numeric(12, 2))  # Sum of line items before tax
+    tax_amount = Column(Numeric(12, 2))  # Total tax amount
+    cgst_amount = Column(Numeric(12, 2), default=0.0)  # Central GST amount
+    sgst_amount = Column(Numeric(12, 2), default=0.0)  # State GST amount
+    igst_amount = Column(Numeric(12, 2), default=0.0)  # Integrated GST amount
+    discount_amount = Column(Numeric(12, 2), default=0.0)  # Total discount applied
+    shipping_amount = Column(Numeric(12, 2), default=0.0)  # Shipping charges
+    adjustment_amount = Column(Numeric(12, 2), default=0.0)  # Any other adjustments
+    total_amount = Column(Numeric(12, 2))  # Final amount including all taxes and charges
+    amount_paid = Column(Numeric(12, 2), default=0.0)  # Amount already paid
+    amount_due = Column(Numeric(12, 2))  # Remaining amount to be paid
     
     # Address details
-    billing_address = Column(Text)  # JSON string for billing address
-    shipping_address = Column(Text, nullable=True)  # JSON string for shipping address
+    billing_address_id = Column(Integer, ForeignKey("user_addresses.id"), nullable=True)
+    shipping_address_id = Column(Integer, ForeignKey("user_addresses.id"), nullable=True)
+    billing_address = Column(JSONB)  # Billing address snapshot
+    shipping_address = Column(JSONB, nullable=True)  # Shipping address snapshot
     
     # Additional details
     notes = Column(Text, nullable=True)  # Invoice notes
@@ -718,7 +827,7 @@ class Invoice(Base):
     file_url = Column(String, nullable=True)  # URL to the generated invoice PDF
     
     # Metadata
-    invoice_metadata = Column(JSON, nullable=True)  # Additional invoice details
+    invoice_metadata = Column(JSONB, nullable=True)  # Additional invoice details
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -726,8 +835,13 @@ class Invoice(Base):
     user = relationship("User", foreign_keys=[user_id])
     seller = relationship("User", foreign_keys=[seller_id])
     order = relationship("Order")
-    line_items = relationship("InvoiceLineItem", back_populates="invoice")
-    payments = relationship("Payment", secondary="invoice_payments", back_populates="invoices")
+    line_items = relationship("InvoiceLineItem", back_populates="invoice", lazy="selectin")
+    payments = relationship("Payment", secondary="invoice_payments", back_populates="invoices", lazy="selectin")
+
+    # "my invoices by status" listing filter
+    __table_args__ = (
+        Index("ix_invoices_user_status", "user_id", "status"),
+    )
 
 
 class InvoiceLineItem(Base):
@@ -738,12 +852,12 @@ class InvoiceLineItem(Base):
     product_id = Column(Integer, ForeignKey("products.id"), nullable=True)  # Can be null for custom line items
     description = Column(String)
     quantity = Column(Float)
-    unit_price = Column(Float)
-    tax_rate = Column(Float, default=0.0)  # Tax rate as percentage
-    tax_amount = Column(Float, default=0.0)  # Tax amount for this line item
-    discount_amount = Column(Float, default=0.0)  # Discount amount for this line item
-    total = Column(Float)  # (unit_price * quantity) + tax_amount - discount_amount
-    hsn_code = Column(String, nullable=True)  # HSN code for GST classification
+    unit_price = Column(Numeric(12, 2))
+    tax_rate = Column(Numeric(5, 2), default=0.0)  # Tax rate as percentage
+    tax_amount = Column(Numeric(12, 2), default=0.0)  # Tax amount for this line item
+    discount_amount = Column(Numeric(12, 2), default=0.0)  # Discount amount for this line item
+    total = Column(Numeric(12, 2), Computed("(unit_price * quantity) + tax_amount - discount_amount", persisted=True))
+    hsn_code = Column(String(8), nullable=True)  # HSN code for GST classification
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -772,13 +886,19 @@ class Testimonial(Base):
     image = Column(String, nullable=True)  # Path to profile image
     testimonial = Column(Text, nullable=False)  # The actual testimonial content
     rating = Column(Integer, nullable=False)  # Rating out of 5
-    date = Column(Date, nullable=False, default=date.today)  # Date of testimonial
+    # Server-assigned: no per-insert Python call or extra bind parameter
+    date = Column(Date, nullable=False, server_default=func.current_date())  # Date of testimonial
     verified = Column(Boolean, default=True)  # Whether the testimonial is verified
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Optional link to user
-    meta_data = Column(JSON, nullable=True)  # Additional metadata
+    meta_data = Column(JSONB, nullable=True)  # Additional metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    
+
+    # Testimonial pages always sort newest-first
+    __table_args__ = (
+        Index("ix_testimonials_date_desc", text("date DESC")),
+    )
+
     # Relationships
     user = relationship("User", back_populates="testimonials")
 
@@ -807,11 +927,17 @@ class Blog(Base):
     published_date = Column(DateTime(timezone=True), nullable=True)
     meta_title = Column(String, nullable=True)  # For SEO
     meta_description = Column(String, nullable=True)  # For SEO
-    tags = Column(JSON, nullable=True)  # Array of tags
+    tags = Column(JSONB, nullable=True)  # Array of tags
     views_count = Column(Integer, default=0)  # Number of views
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Public listings only ever see published posts, ordered by date;
+    # drafts and archived rows stay out of the index entirely
+    __table_args__ = (
+        Index("ix_blogs_published_date", "published_date", postgresql_where=text("status = 'published'")),
+    )
+
     # Relationships
     author = relationship("User", backref="blogs")
     featured_products = relationship("Product", secondary=blog_product, backref="featured_in_blogs")
@@ -823,12 +949,16 @@ class ShippingMethod(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    price = Column(Float, nullable=False)
+    price = Column(Numeric(12, 2), nullable=False)
     estimated_days = Column(String, nullable=False)  # e.g., "3-5 days", "1-2 days"
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_shipping_methods_active", "id", postgresql_where=text("is_active")),
+    )
+
 
 class UserAddress(Base):
     __tablename__ = "user_addresses"
@@ -847,9 +977,27 @@ class UserAddress(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    
-    # Relationship
-    user = relationship("User", back_populates="addresses")
+
+    # No endpoint serializes the owning user, so a lazy load here would
+    # only ever be an accidental N+1; raise instead. Identity-map hits
+    # (the common case — current_user is already in the session) still
+    # resolve without SQL. Use selectinload if a query ever needs it.
+    user = relationship("User", back_populates="addresses", lazy="raise_on_sql")
+
+    # Every address route filters user_id AND is_active, so the listing
+    # query resolves entirely in this composite index. The unique partial
+    # index serves the default-address probe and makes "one default per
+    # user" a constraint instead of handler discipline; soft-deleted rows
+    # keep their flag, hence the is_active term.
+    __table_args__ = (
+        Index("ix_user_addresses_user_active", "user_id", "is_active", "is_default"),
+        Index(
+            "ux_user_default_addr",
+            "user_id",
+            unique=True,
+            postgresql_where=text("is_default AND is_active"),
+        ),
+    )
 
 
 class PasswordResetToken(Base):
@@ -864,3 +1012,56 @@ class PasswordResetToken(Base):
 
     # Relationship
     user = relationship("User", backref="password_reset_tokens")
+
+
+# GIN indexes for JSONB containment filters (@>). jsonb_path_ops indexes
+# only the value paths, giving a much smaller index than the default
+# jsonb_ops while covering the containment queries these columns serve.
+Index(
+    "ix_blogs_tags_gin",
+    Blog.tags,
+    postgresql_using="gin",
+    postgresql_ops={"tags": "jsonb_path_ops"},
+)
+Index(
+    "ix_products_specifications_gin",
+    Product.specifications,
+    postgresql_using="gin",
+    postgresql_ops={"specifications": "jsonb_path_ops"},
+)
+class ProductRanking(Base):
+    """Read-only mapping of the product_rankings materialized view.
+
+    Sales rollups (units sold, revenue, rank) are aggregated offline from
+    order_items and refreshed with REFRESH MATERIALIZED VIEW CONCURRENTLY
+    (see app.utils.db_migration.refresh_product_rankings), so the catalog
+    can join ranking data without any UPDATE traffic on products. The
+    is_view marker keeps schema bootstrap from emitting CREATE TABLE.
+    """
+    __tablename__ = "product_rankings"
+    __table_args__ = {"info": {"is_view": True}}
+
+    product_id = Column(Integer, primary_key=True)
+    units_sold = Column(Integer)
+    revenue = Column(Numeric(14, 2))
+    sales_rank = Column(Integer)
+
+
+# Partial indexes for the hot flag filters: tiny (only flagged rows) and
+# matched when the listing filters on the corresponding bit
+Index(
+    "ix_products_featured",
+    Product.id,
+    postgresql_where=text(f"(flags & {FLAG_FEATURED}) <> 0"),
+)
+Index(
+    "ix_products_bestseller",
+    Product.id,
+    postgresql_where=text(f"(flags & {FLAG_BESTSELLER}) <> 0"),
+)
+Index(
+    "ix_payments_gateway_response_gin",
+    Payment.gateway_response,
+    postgresql_using="gin",
+    postgresql_ops={"gateway_response": "jsonb_path_ops"},
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, Float, DateTime, Enum, Table, JSON, Date, Numeric
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, Float, DateTime, Enum, Table, JSON, Date, Numeric, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -35,6 +35,19 @@ class PurchaseOrderStatus(str, enum.Enum):
     RECEIVED = "received"
     CANCELLED = "cancelled"
 
+class ProductionBatchStatus(str, enum.Enum):
+    PLANNED = "planned"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+class PurchaseIndentStatus(str, enum.Enum):
+    DRAFT = "draft"
+    PENDING = "pending"
+    APPROVED = "approved"
+    REJECTED = "rejected"
+    CLOSED = "closed"
+
 class GatePassType(str, enum.Enum):
     INWARD = "inward"
     OUTWARD = "outward"
@@ -61,7 +74,7 @@ class InventoryItem(Base):
     min_stock_level = Column(Numeric(precision=10, scale=3), default=0)
     max_stock_level = Column(Numeric(precision=10, scale=3), nullable=True)
     reorder_level = Column(Numeric(precision=10, scale=3), default=0)
-    cost_price = Column(Float, default=0.0)
+    cost_price = Column(Numeric(12, 2), default=0)
     hsn_code = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
     is_raw_material = Column(Boolean, default=True)  # True for raw materials, False for finished goods
@@ -104,11 +117,11 @@ class StockMovement(Base):
     __tablename__ = "stock_movements"
 
     id = Column(Integer, primary_key=True, index=True)
-    inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"))
+    inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), index=True)
     movement_type = Column(Enum(StockMovementType))
     quantity = Column(Numeric(precision=10, scale=3))
-    unit_price = Column(Float, nullable=True)
-    total_value = Column(Float, nullable=True)
+    unit_price = Column(Numeric(12, 2), nullable=True)
+    total_value = Column(Numeric(12, 2), nullable=True)
     reference_number = Column(String, nullable=True)  # PO number, SO number, etc.
     reference_type = Column(String, nullable=True)  # "purchase_order", "sales_order", etc.
     reference_id = Column(Integer, nullable=True)  # ID of the reference document
@@ -122,12 +135,24 @@ class StockMovement(Base):
     user = relationship("models.User", foreign_keys=[performed_by])
     purchase_receipt = relationship("PurchaseReceipt", back_populates="stock_movements", uselist=False)
 
+    # Movements are append-only with monotonically increasing timestamps,
+    # so a BRIN index serves time-range scans at a fraction of a btree's
+    # size and insert cost
+    __table_args__ = (
+        Index(
+            "ix_stock_movements_performed_brin",
+            "performed_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": "32"},
+        ),
+    )
+
 # Stock Movement for Packaged Products
 class PackagedProductMovement(Base):
     __tablename__ = "packaged_product_movements"
 
     id = Column(Integer, primary_key=True, index=True)
-    packaged_product_id = Column(Integer, ForeignKey("packaged_products.id"))
+    packaged_product_id = Column(Integer, ForeignKey("packaged_products.id"), index=True)
     movement_type = Column(Enum(StockMovementType))
     quantity = Column(Integer)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
@@ -145,6 +170,15 @@ class PackagedProductMovement(Base):
     order_item = relationship("models.OrderItem", foreign_keys=[order_item_id])
     user = relationship("models.User", foreign_keys=[performed_by])
 
+    __table_args__ = (
+        Index(
+            "ix_packaged_product_movements_performed_brin",
+            "performed_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": "32"},
+        ),
+    )
+
 # Bill of Materials (Recipe for a product)
 class BillOfMaterial(Base):
     __tablename__ = "bill_of_materials"
@@ -169,8 +203,8 @@ class BillOfMaterialItem(Base):
     __tablename__ = "bill_of_material_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    bom_id = Column(Integer, ForeignKey("bill_of_materials.id"))
-    inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"))
+    bom_id = Column(Integer, ForeignKey("bill_of_materials.id"), index=True)
+    inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), index=True)
     quantity = Column(Numeric(precision=10, scale=3))
     unit_of_measure = Column(Enum(UnitOfMeasure))
     notes = Column(Text, nullable=True)
@@ -190,7 +224,17 @@ class ProductionBatch(Base):
     planned_quantity = Column(Integer)
     produced_quantity = Column(Integer, default=0)
     production_date = Column(Date)
-    status = Column(String)  # planned, in_progress, completed, cancelled
+    # Native enum instead of free-form varchar: 4-byte storage, and the
+    # type rejects typos. values_callable keeps the labels lowercase to
+    # match the strings existing rows already hold.
+    status = Column(
+        Enum(
+            ProductionBatchStatus,
+            name="production_batch_status",
+            values_callable=lambda e: [m.value for m in e],
+        ),
+        default=ProductionBatchStatus.PLANNED,
+    )
     notes = Column(Text, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -207,7 +251,7 @@ class ProductionBatchPackaging(Base):
     __tablename__ = "production_batch_packaging"
 
     id = Column(Integer, primary_key=True, index=True)
-    batch_id = Column(Integer, ForeignKey("production_batches.id"))
+    batch_id = Column(Integer, ForeignKey("production_batches.id"), index=True)
     packaged_product_id = Column(Integer, ForeignKey("packaged_products.id"))
     quantity = Column(Integer)
     notes = Column(Text, nullable=True)
@@ -231,7 +275,7 @@ class Supplier(Base):
     gst_number = Column(String, nullable=True)
     pan_number = Column(String, nullable=True)
     payment_terms = Column(String, nullable=True)
-    credit_limit = Column(Float, nullable=True)
+    credit_limit = Column(Numeric(12, 2), nullable=True)
     is_active = Column(Boolean, default=True)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -250,7 +294,14 @@ class PurchaseIndent(Base):
     department = Column(String, nullable=True)
     request_date = Column(Date)
     required_by_date = Column(Date, nullable=True)
-    status = Column(String)  # draft, pending, approved, rejected, closed
+    status = Column(
+        Enum(
+            PurchaseIndentStatus,
+            name="purchase_indent_status",
+            values_callable=lambda e: [m.value for m in e],
+        ),
+        default=PurchaseIndentStatus.DRAFT,
+    )
     notes = Column(Text, nullable=True)
     approved_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     approved_at = Column(DateTime(timezone=True), nullable=True)
@@ -267,11 +318,11 @@ class PurchaseIndentItem(Base):
     __tablename__ = "purchase_indent_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    indent_id = Column(Integer, ForeignKey("purchase_indents.id"))
+    indent_id = Column(Integer, ForeignKey("purchase_indents.id"), index=True)
     inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"))
     quantity = Column(Numeric(precision=10, scale=3))
     unit_of_measure = Column(Enum(UnitOfMeasure))
-    estimated_price = Column(Float, nullable=True)
+    estimated_price = Column(Numeric(12, 2), nullable=True)
     notes = Column(Text, nullable=True)
     
     # Relationships
@@ -290,11 +341,11 @@ class PurchaseOrder(Base):
     expected_delivery_date = Column(Date, nullable=True)
     delivery_address = Column(Text)
     status = Column(Enum(PurchaseOrderStatus), default=PurchaseOrderStatus.DRAFT)
-    subtotal = Column(Float)
-    tax_amount = Column(Float, default=0.0)
-    shipping_amount = Column(Float, default=0.0)
-    discount_amount = Column(Float, default=0.0)
-    total_amount = Column(Float)
+    subtotal = Column(Numeric(12, 2))
+    tax_amount = Column(Numeric(12, 2), default=0)
+    shipping_amount = Column(Numeric(12, 2), default=0)
+    discount_amount = Column(Numeric(12, 2), default=0)
+    total_amount = Column(Numeric(12, 2))
     payment_terms = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"))
@@ -316,17 +367,17 @@ class PurchaseOrderItem(Base):
     __tablename__ = "purchase_order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    po_id = Column(Integer, ForeignKey("purchase_orders.id"))
+    po_id = Column(Integer, ForeignKey("purchase_orders.id"), index=True)
     inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"))
     indent_item_id = Column(Integer, ForeignKey("purchase_indent_items.id"), nullable=True)
     quantity = Column(Numeric(precision=10, scale=3))
     received_quantity = Column(Numeric(precision=10, scale=3), default=0)
     unit_of_measure = Column(Enum(UnitOfMeasure))
-    unit_price = Column(Float)
-    tax_rate = Column(Float, default=0.0)
-    tax_amount = Column(Float, default=0.0)
-    discount_amount = Column(Float, default=0.0)
-    total_amount = Column(Float)
+    unit_price = Column(Numeric(12, 2))
+    tax_rate = Column(Numeric(5, 2), default=0)
+    tax_amount = Column(Numeric(12, 2), default=0)
+    discount_amount = Column(Numeric(12, 2), default=0)
+    total_amount = Column(Numeric(12, 2))
     hsn_code = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
     
@@ -360,7 +411,7 @@ class PurchaseReceiptItem(Base):
     __tablename__ = "purchase_receipt_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    receipt_id = Column(Integer, ForeignKey("purchase_receipts.id"))
+    receipt_id = Column(Integer, ForeignKey("purchase_receipts.id"), index=True)
     po_item_id = Column(Integer, ForeignKey("purchase_order_items.id"))
     received_quantity = Column(Numeric(precision=10, scale=3))
     accepted_quantity = Column(Numeric(precision=10, scale=3))
@@ -404,7 +455,7 @@ class GatePassItem(Base):
     __tablename__ = "gate_pass_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    gate_pass_id = Column(Integer, ForeignKey("gate_passes.id"))
+    gate_pass_id = Column(Integer, ForeignKey("gate_passes.id"), index=True)
     item_type = Column(String)  # "raw_material", "packaged_product"
     item_id = Column(Integer)  # ID of inventory_item or packaged_product
     quantity = Column(Numeric(precision=10, scale=3))
@@ -413,3 +464,16 @@ class GatePassItem(Base):
     
     # Relationships
     gate_pass = relationship("GatePass", back_populates="items")
+
+# Read-only mapping of the mv_current_stock materialized view: stock on
+# hand per inventory item, derived by summing signed movements. Unlike
+# InventoryItem.current_stock it cannot drift from the movement ledger;
+# refresh via app.utils.db_migration.refresh_current_stock().
+class CurrentStock(Base):
+    __tablename__ = "mv_current_stock"
+
+    inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), primary_key=True)
+    quantity = Column(Numeric(precision=12, scale=3))
+
+    # Created by the migration as a materialized view, not a table
+    __table_args__ = {"info": {"is_view": True}}
@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, Float, DateTime, Enum, Table, JSON
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, Float, Numeric, DateTime, Enum, Table, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -46,9 +47,9 @@ class LogisticsProvider(Base):
     api_secret = Column(String, nullable=True)
     api_endpoint = Column(String, nullable=True)
     status = Column(Enum(LogisticsProviderStatus), default=LogisticsProviderStatus.ACTIVE)
-    service_areas = Column(JSON, nullable=True)  # JSON array of regions/states covered
-    service_types = Column(JSON, nullable=True)  # JSON array of service types (express, standard, etc.)
-    pricing_tiers = Column(JSON, nullable=True)  # JSON object with pricing details
+    service_areas = Column(JSONB, nullable=True)  # JSON array of regions/states covered
+    service_types = Column(JSONB, nullable=True)  # JSON array of service types (express, standard, etc.)
+    pricing_tiers = Column(JSONB, nullable=True)  # JSON object with pricing details
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -59,22 +60,22 @@ class Shipment(Base):
     __tablename__ = "shipments"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    logistics_provider_id = Column(Integer, ForeignKey("logistics_providers.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    logistics_provider_id = Column(Integer, ForeignKey("logistics_providers.id"), index=True)
     tracking_number = Column(String, unique=True, index=True)
     waybill_number = Column(String, nullable=True)
     status = Column(Enum(ShipmentStatus), default=ShipmentStatus.PENDING)
     estimated_delivery_date = Column(DateTime(timezone=True), nullable=True)
     actual_delivery_date = Column(DateTime(timezone=True), nullable=True)
-    shipping_cost = Column(Float, default=0.0)
+    shipping_cost = Column(Numeric(12, 2), default=0)
     weight = Column(Float, nullable=True)  # Weight in kg
-    dimensions = Column(JSON, nullable=True)  # JSON with length, width, height
-    pickup_address = Column(JSON)  # JSON with address details
-    delivery_address = Column(JSON)  # JSON with address details
+    dimensions = Column(JSONB, nullable=True)  # JSON with length, width, height
+    pickup_address = Column(JSONB)  # JSON with address details
+    delivery_address = Column(JSONB)  # JSON with address details
     special_instructions = Column(Text, nullable=True)
     signature_required = Column(Boolean, default=False)
     is_insured = Column(Boolean, default=False)
-    insurance_amount = Column(Float, default=0.0)
+    insurance_amount = Column(Numeric(12, 2), default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -98,11 +99,17 @@ class ShipmentTracking(Base):
     # Relationships
     shipment = relationship("Shipment", back_populates="tracking_updates")
 
+    # One composite index serves the FK join and the "latest update per
+    # shipment" ordering
+    __table_args__ = (
+        Index("ix_shipment_tracking_shipment_ts", "shipment_id", "timestamp"),
+    )
+
 class DeliveryAttempt(Base):
     __tablename__ = "delivery_attempts"
     
     id = Column(Integer, primary_key=True, index=True)
-    shipment_id = Column(Integer, ForeignKey("shipments.id"))
+    shipment_id = Column(Integer, ForeignKey("shipments.id"), index=True)
     attempt_number = Column(Integer, default=1)
     status = Column(Enum(DeliveryAttemptStatus))
     timestamp = Column(DateTime(timezone=True))
@@ -116,5 +123,15 @@ class DeliveryAttempt(Base):
     # Relationships
     shipment = relationship("Shipment", back_populates="delivery_attempts")
 
+# Containment lookups ("which providers serve this state?") filter
+# service_areas with @>; jsonb_path_ops keeps the GIN index small while
+# covering exactly those queries
+Index(
+    "ix_logistics_providers_service_areas_gin",
+    LogisticsProvider.service_areas,
+    postgresql_using="gin",
+    postgresql_ops={"service_areas": "jsonb_path_ops"},
+)
+
 # Add relationship to Order model
 Order.shipments = relationship("Shipment", back_populates="order")
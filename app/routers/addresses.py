@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import bindparam, func, insert, literal, select, update
 from sqlalchemy.orm import Session
 from typing import List
-from datetime import datetime
 
 from ..database import get_db
 from ..models import UserAddress, User
@@ -9,17 +9,65 @@ from ..schemas import UserAddressBase, UserAddressCreate, UserAddressUpdate, Use
 from .auth import get_current_active_user
 
 router = APIRouter()
+
+# Prebuilt statements: constructing them once at import time gives every
+# request an identical cache key, so the engine's compiled-SQL cache
+# always hits and the per-request ORM compilation step disappears
+_ADDRESSES_BY_USER = select(UserAddress).where(
+    UserAddress.user_id == bindparam("user_id"),
+    UserAddress.is_active.is_(True),
+)
+
+def _get_owned_address(db, address_id, current_user):
+    """Fetch an address by PK, restricted to the caller's active rows.
+
+    db.get() goes through the identity map, so a row already loaded in
+    this session costs no SQL, and a miss is a plain PK lookup. The
+    ownership/active checks run in Python; a row that exists but belongs
+    to someone else looks identical to a missing one (callers 404 both).
+    """
+    address = db.get(UserAddress, address_id)
+    if address is None or address.user_id != current_user.id or not address.is_active:
+        return None
+    return address
+
+def _unset_default_cte(user_id, exclude_id=None):
+    """CTE clearing the user's current default address.
+
+    Attached to the INSERT/UPDATE that installs the new default so the
+    flip happens in one statement instead of two round-trips.
+    """
+    conditions = [
+        UserAddress.user_id == user_id,
+        UserAddress.is_default == True,
+        UserAddress.is_active == True,
+    ]
+    if exclude_id is not None:
+        conditions.append(UserAddress.id != exclude_id)
+    return (
+        update(UserAddress)
+        .where(*conditions)
+        .values(is_default=False)
+        .cte("unset_default")
+    )
+
+def _cte_guard(cte):
+    """Scalar subquery that forces the CTE to run before the main statement.
+
+    Postgres executes data-modifying CTEs in unspecified order relative
+    to the main statement unless the main statement reads from them; the
+    new default row must not be checked against ux_user_default_addr
+    before the old default is cleared.
+    """
+    return select(func.count()).select_from(cte).scalar_subquery() >= 0
 @router.get("/", response_model=List[UserAddressSchema])
 async def get_user_addresses(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all addresses for the current user"""
-    addresses = db.query(UserAddress).filter(
-        UserAddress.user_id == current_user.id,
-        UserAddress.is_active == True
-    ).all()
-    
+    addresses = db.scalars(_ADDRESSES_BY_USER, {"user_id": current_user.id}).all()
+
     # Return the addresses (empty list if none exist)
     return addresses
 
@@ -30,20 +78,29 @@ async def create_user_address(
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new address for the current user"""
-    # If this address is set as default, unset other defaults
+    payload = {**address.dict(), "user_id": current_user.id}
     if address.is_default:
-        db.query(UserAddress).filter(
-            UserAddress.user_id == current_user.id,
-            UserAddress.is_default == True
-        ).update({"is_default": False})
-    
-    # Create the address
-    db_address = UserAddress(**address.dict(), user_id=current_user.id)
-    db.add(db_address)
+        # Clear the old default and insert the new one in a single
+        # statement: one round-trip, and the flip is atomic
+        unset = _unset_default_cte(current_user.id)
+        columns = list(payload)
+        source = select(*(literal(payload[c]) for c in columns)).where(_cte_guard(unset))
+        stmt = (
+            insert(UserAddress.__table__)
+            .from_select(columns, source)
+            .returning(*UserAddress.__table__.c)
+            .add_cte(unset)
+        )
+    else:
+        stmt = (
+            insert(UserAddress.__table__)
+            .values(**payload)
+            .returning(*UserAddress.__table__.c)
+        )
+    # RETURNING hydrates the full row, so no post-commit refresh
+    row = dict(db.execute(stmt).mappings().one())
     db.commit()
-    db.refresh(db_address)
-    
-    return db_address
+    return row
 
 @router.get("/{address_id}", response_model=UserAddressSchema)
 async def get_user_address(
@@ -52,15 +109,11 @@ async def get_user_address(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific address by ID"""
-    address = db.query(UserAddress).filter(
-        UserAddress.id == address_id,
-        UserAddress.user_id == current_user.id,
-        UserAddress.is_active == True
-    ).first()
-    
+    address = _get_owned_address(db, address_id, current_user)
+
     if not address:
         raise HTTPException(status_code=404, detail="Address not found")
-    
+
     return address
 
 @router.put("/{address_id}", response_model=UserAddressSchema)
@@ -71,33 +124,37 @@ async def update_user_address(
     current_user: User = Depends(get_current_active_user)
 ):
     """Update an address"""
-    db_address = db.query(UserAddress).filter(
-        UserAddress.id == address_id,
-        UserAddress.user_id == current_user.id,
-        UserAddress.is_active == True
-    ).first()
-    
-    if not db_address:
-        raise HTTPException(status_code=404, detail="Address not found")
-    
-    # If this address is being set as default, unset other defaults
-    if address_update.is_default:
-        db.query(UserAddress).filter(
-            UserAddress.user_id == current_user.id,
-            UserAddress.is_default == True,
-            UserAddress.id != address_id
-        ).update({"is_default": False})
-    
-    # Update fields
     update_data = address_update.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_address, key, value)
-    
-    db_address.updated_at = datetime.now()
+    if not update_data:
+        # Nothing to change; answer like the GET
+        return await get_user_address(address_id, db, current_user)
+
+    # Apply the update and, when installing a new default, clear the old
+    # one via an attached CTE — one statement, one round-trip, and
+    # RETURNING replaces the post-commit refresh. updated_at comes from
+    # the column's onupdate.
+    stmt = (
+        update(UserAddress)
+        .where(
+            UserAddress.id == address_id,
+            UserAddress.user_id == current_user.id,
+            UserAddress.is_active == True,
+        )
+        .values(**update_data)
+        .returning(*UserAddress.__table__.c)
+        .execution_options(synchronize_session=False)
+    )
+    if address_update.is_default:
+        unset = _unset_default_cte(current_user.id, exclude_id=address_id)
+        stmt = stmt.where(_cte_guard(unset)).add_cte(unset)
+
+    row = db.execute(stmt).mappings().one_or_none()
+    if row is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Address not found")
+    row = dict(row)
     db.commit()
-    db.refresh(db_address)
-    
-    return db_address
+    return row
 
 @router.delete("/{address_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user_address(
@@ -106,29 +163,48 @@ async def delete_user_address(
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete an address"""
-    db_address = db.query(UserAddress).filter(
-        UserAddress.id == address_id,
-        UserAddress.user_id == current_user.id,
-        UserAddress.is_active == True
-    ).first()
-    
+    db_address = _get_owned_address(db, address_id, current_user)
+
     if not db_address:
         raise HTTPException(status_code=404, detail="Address not found")
-    
-    # If this is the default address, find another address to make default
+
     if db_address.is_default:
-        next_address = db.query(UserAddress).filter(
-            UserAddress.user_id == current_user.id,
-            UserAddress.id != address_id,
-            UserAddress.is_active == True
-        ).first()
-        
-        if next_address:
-            next_address.is_default = True
-    
-    # Soft delete by setting is_active to False
-    db_address.is_active = False
-    db_address.updated_at = datetime.now()
+        # Soft-delete the default and promote the next active address in
+        # one statement: the deactivation runs as a CTE, the main UPDATE
+        # picks the successor via subquery. No window between "read next"
+        # and "write flags" for a concurrent delete to slip into, and the
+        # guard orders the CTE first so ux_user_default_addr never sees
+        # two defaults. updated_at comes from the column's onupdate.
+        deactivated = (
+            update(UserAddress)
+            .where(UserAddress.id == address_id)
+            .values(is_active=False, is_default=False)
+            .cte("deactivated")
+        )
+        next_id = (
+            select(UserAddress.id)
+            .where(
+                UserAddress.user_id == current_user.id,
+                UserAddress.id != address_id,
+                UserAddress.is_active == True,
+            )
+            .order_by(UserAddress.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(UserAddress)
+            .where(UserAddress.id == next_id, _cte_guard(deactivated))
+            .values(is_default=True)
+            .add_cte(deactivated)
+        )
+    else:
+        stmt = (
+            update(UserAddress)
+            .where(UserAddress.id == address_id)
+            .values(is_active=False)
+        )
+    db.execute(stmt.execution_options(synchronize_session=False))
     db.commit()
-    
+
     return {"detail": "Address deleted"}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, asc, or_
+from sqlalchemy import func, desc, asc, or_, text
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import json
@@ -15,6 +15,18 @@ from ..cache import cached, invalidate_blog_cache, redis_client
 
 router = APIRouter()
 
+def increment_blog_views(db: Session, blog_id: int):
+    """Bump a blog's view counter with a single atomic UPDATE.
+
+    The ORM's read-modify-write (blog.views_count += 1) holds the row
+    lock from SELECT to COMMIT and loses counts under concurrent views;
+    one server-side increment does neither.
+    """
+    db.execute(
+        text("UPDATE blogs SET views_count = views_count + 1 WHERE id = :id"),
+        {"id": blog_id},
+    )
+
 # Helper function to generate slug from title
 def generate_slug(title: str, db: Session) -> str:
     """Generate a unique slug from the blog title"""
@@ -62,7 +74,7 @@ async def create_blog(
         published_date=blog.published_date if blog.status == "published" else None,
         meta_title=blog.meta_title or blog.title,
         meta_description=blog.meta_description,
-        tags=json.dumps(blog.tags) if blog.tags else None
+        tags=blog.tags if blog.tags else None
     )
     
     db.add(db_blog)
@@ -253,7 +265,7 @@ async def read_blog(
             blog.tags = []
     
     # Increment views count
-    blog.views_count += 1
+    increment_blog_views(db, blog.id)
     db.commit()
     
     return blog
@@ -340,7 +352,7 @@ async def update_blog(
         db_blog.meta_description = blog_update.meta_description
     
     if blog_update.tags is not None:
-        db_blog.tags = json.dumps(blog_update.tags)
+        db_blog.tags = blog_update.tags
     
     # Update featured products if provided
     if blog_update.featured_product_ids is not None:
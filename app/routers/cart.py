@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, bindparam
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -8,6 +9,10 @@ from .auth import get_current_active_user
 
 router = APIRouter()
 
+# Prebuilt with bindparam so every execution reuses the same compiled
+# statement from the engine's query cache
+_CART_ITEMS_BY_USER = select(models.CartItem).where(models.CartItem.user_id == bindparam("user_id"))
+
 @router.post("/items", response_model=schemas.CartItem)
 async def add_to_cart(
     cart_item: schemas.CartItemCreate,
@@ -59,7 +64,7 @@ async def read_cart(
     db: Session = Depends(get_db)
 ):
     # Get all cart items for current user
-    cart_items = db.query(models.CartItem).filter(models.CartItem.user_id == current_user.id).all()
+    cart_items = db.scalars(_CART_ITEMS_BY_USER, {"user_id": current_user.id}).all()
     
     # Calculate total
     total = 0
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from decimal import Decimal
 from pydantic import BaseModel
 
 from .. import models, schemas
 from ..database import get_db
 from .auth import get_current_active_user
+from .shipping_methods import get_active_shipping_method
 
 router = APIRouter()
 
@@ -40,16 +42,15 @@ async def get_checkout_summary(
             tax_total += (product.tax_rate/100) * product_amount
             subtotal += product_amount
     
-    # Get shipping cost
-    shipping_method = db.query(models.ShippingMethod).filter(
-        models.ShippingMethod.id == shipping_method_id,
-        models.ShippingMethod.is_active == True
-    ).first()
+    # Get shipping cost from the cached reference data
+    shipping_method = get_active_shipping_method(shipping_method_id)
     
     if not shipping_method:
         raise HTTPException(status_code=404, detail="Shipping method not found")
     
-    shipping_cost = shipping_method.price
+    # The cache stores price as a float (JSON round-trip); convert so it
+    # combines with the Decimal product amounts
+    shipping_cost = Decimal(str(shipping_method["price"]))
 
     tax_amount = round(tax_total, 2)
     
@@ -9,7 +9,7 @@ import shutil
 from pathlib import Path
 
 from .. import models, schemas, database, utils
-from ..database import get_db
+from ..database import get_db, bulk_insert_rows
 from .auth import get_current_user
 from ..utils.pdf_generator import pdf_generator
 
@@ -82,6 +82,8 @@ def generate_invoice(
         amount_due=order.total_amount if order.payment_status == models.PaymentStatus.PENDING else 0.0,
         
         # Address details
+        billing_address_id=order.billing_address_id,
+        shipping_address_id=order.shipping_address_id,
         billing_address=order.billing_address,
         shipping_address=order.shipping_address,
         
@@ -98,22 +100,24 @@ def generate_invoice(
     # Create invoice line items from order items
     order_items = db.query(models.OrderItem).filter(models.OrderItem.order_id == order_id).all()
     
+    line_item_rows = []
     for item in order_items:
         product = db.query(models.Product).filter(models.Product.id == item.product_id).first()
         
-        line_item = models.InvoiceLineItem(
-            invoice_id=new_invoice.id,
-            product_id=item.product_id,
-            description=product.name if product else "Product",
-            quantity=item.quantity,
-            unit_price=item.price,
-            tax_rate=item.tax_amount / (item.price * item.quantity) * 100 if item.tax_amount > 0 else 0.0,
-            tax_amount=item.tax_amount,
-            total=item.total,
-            hsn_code=product.hsn_code if product else None
-        )
-        
-        db.add(line_item)
+        line_item_rows.append({
+            "invoice_id": new_invoice.id,
+            "product_id": item.product_id,
+            "description": product.name if product else "Product",
+            "quantity": item.quantity,
+            "unit_price": item.price,
+            "tax_rate": item.tax_amount / (item.price * item.quantity) * 100 if item.tax_amount > 0 else 0.0,
+            "tax_amount": item.tax_amount,
+            "discount_amount": 0,
+            "hsn_code": product.hsn_code if product else None,
+        })
+    
+    # One batched write instead of a flush per line item
+    bulk_insert_rows(db, models.InvoiceLineItem.__table__, line_item_rows)
     
     # Update order with invoice number
     order.invoice_number = invoice_number
@@ -2,11 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
+from decimal import Decimal
 import uuid
 
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_db, bulk_insert_rows
 from .auth import get_current_active_user
+from .shipping_methods import get_active_shipping_method
 
 router = APIRouter()
 
@@ -34,15 +36,16 @@ async def create_order(
     if not shipping_address:
         raise HTTPException(status_code=404, detail="Shipping address not found")
     
-    # Verify shipping method exists
-    shipping_method = db.query(models.ShippingMethod).filter(
-        models.ShippingMethod.id == order_request.shipping_method_id,
-        models.ShippingMethod.is_active == True
-    ).first()
+    # Verify shipping method exists (cached reference data)
+    shipping_method = get_active_shipping_method(order_request.shipping_method_id)
     
     if not shipping_method:
         raise HTTPException(status_code=404, detail="Shipping method not found")
-    
+
+    # The cache stores price as a float (JSON round-trip); convert once
+    # so it combines with the Decimal product amounts below
+    shipping_cost = Decimal(str(shipping_method["price"]))
+
     # Verify payment method exists and belongs to user
     payment_method = db.query(models.PaymentMethod).filter(
         models.PaymentMethod.id == order_request.payment_method_id,
@@ -75,19 +78,23 @@ async def create_order(
         subtotal_amount=0,  # Will be updated after adding items
         total_amount=0,  # Will be updated after adding items
         tax_amount=0,  # Will be updated after adding items
-        shipping_amount=shipping_method.price,
+        shipping_amount=shipping_cost,
         status=models.OrderStatus.PENDING,
         payment_status=models.PaymentStatus.PENDING,
         payment_method=payment_method.method_type,
-        shipping_method=shipping_method.name,
-        shipping_address=str(shipping_address_json),  # Convert to string for storage
-        billing_address=str(shipping_address_json)  # Using shipping address as billing address
+        shipping_method=shipping_method["name"],
+        shipping_address_id=shipping_address.id,
+        billing_address_id=shipping_address.id,
+        shipping_address=shipping_address_json,
+        billing_address=shipping_address_json  # Using shipping address as billing address
     )
     
     db.add(order)
     db.flush()  # Flush to get the order ID
     
-    # Add order items
+    # Add order items; rows are collected and written in one batch so a
+    # large cart doesn't pay per-row INSERT overhead
+    order_item_rows = []
     for cart_item in cart_items:
         product = db.query(models.Product).filter(models.Product.id == cart_item.product_id).first()
         
@@ -101,25 +108,24 @@ async def create_order(
         # Default tax rate (10%)
         item_tax = item_total * (product.tax_rate/100)
         item_tax = round(item_tax, 2)
-        # Create order item
-        order_item = models.OrderItem(
-            order_id=order.id,
-            product_id=product.id,
-            seller_id=product.seller_id,
-            quantity=cart_item.quantity,
-            price=item_price,
-            total=item_total,
-            tax_amount=item_tax
-        )
-        
-        db.add(order_item)
+        # Create order item row
+        order_item_rows.append({
+            "order_id": order.id,
+            "product_id": product.id,
+            "seller_id": product.seller_id,
+            "quantity": cart_item.quantity,
+            "price": item_price,
+            "tax_amount": item_tax,
+        })
         
         # Update order totals
         subtotal += item_total
         tax_amount += item_tax
     
+    bulk_insert_rows(db, models.OrderItem.__table__, order_item_rows)
+    
     # Update order with calculated totals
-    total_amount = subtotal + tax_amount + order.shipping_amount
+    total_amount = subtotal + tax_amount + shipping_cost
     
     order.subtotal_amount = subtotal
     order.tax_amount = tax_amount
@@ -219,7 +225,7 @@ async def get_order(
         # Add the missing fields required by the schema
         "payment_method_id": None,
         "shipping_method_id": None,
-        "shipping_address_id": None
+        "shipping_address_id": order.shipping_address_id
     }
 
     return order_dict
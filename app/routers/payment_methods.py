@@ -88,12 +88,14 @@ async def create_payment_method(
     if existing_methods == 0:
         payment_method.is_default = True
     
-    # If this method is set as default, unset other defaults
+    # If this method is set as default, unset other defaults. No row
+    # touched here is read again in this transaction, so skip the
+    # identity-map synchronization pass.
     if payment_method.is_default:
         db.query(PaymentMethod).filter(
             PaymentMethod.user_id == current_user.id,
             PaymentMethod.is_default == True
-        ).update({"is_default": False})
+        ).update({"is_default": False}, synchronize_session=False)
     
     # Create the payment method
     payment_data = payment_method.dict()
@@ -132,7 +134,7 @@ async def update_payment_method(
             PaymentMethod.user_id == current_user.id,
             PaymentMethod.is_default == True,
             PaymentMethod.id != payment_method_id
-        ).update({"is_default": False})
+        ).update({"is_default": False}, synchronize_session=False)
     
     # Update fields
     for key, value in payment_method_update.dict().items():
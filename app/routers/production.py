@@ -249,7 +249,7 @@ async def read_production_batches(
     skip: int = 0,
     limit: int = 100,
     product_id: Optional[int] = None,
-    status: Optional[str] = None,
+    status: Optional[schemas_inventory.ProductionBatchStatus] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     current_user: schemas.User = Depends(get_current_active_user),
@@ -298,7 +298,7 @@ async def start_production_batch(
         raise HTTPException(status_code=404, detail="Production batch not found")
     
     # Check if batch is in planned status
-    if db_batch.status != "planned":
+    if db_batch.status != models_inventory.ProductionBatchStatus.PLANNED:
         raise HTTPException(status_code=400, detail="Only planned batches can be started")
     
     # Get BOM items
@@ -346,7 +346,7 @@ async def start_production_batch(
         inventory_item.current_stock -= required_qty
     
     # Update batch status
-    db_batch.status = "in_progress"
+    db_batch.status = models_inventory.ProductionBatchStatus.IN_PROGRESS
     
     db.commit()
     db.refresh(db_batch)
@@ -365,7 +365,7 @@ async def complete_production_batch(
         raise HTTPException(status_code=404, detail="Production batch not found")
     
     # Check if batch is in progress
-    if db_batch.status != "in_progress":
+    if db_batch.status != models_inventory.ProductionBatchStatus.IN_PROGRESS:
         raise HTTPException(status_code=400, detail="Only in-progress batches can be completed")
     
     # Check if produced quantity is valid
@@ -374,7 +374,7 @@ async def complete_production_batch(
     
     # Update batch
     db_batch.produced_quantity = produced_quantity
-    db_batch.status = "completed"
+    db_batch.status = models_inventory.ProductionBatchStatus.COMPLETED
     
     # Get packaged items
     packaged_items = db.query(models_inventory.ProductionBatchPackaging).filter(models_inventory.ProductionBatchPackaging.batch_id == batch_id).all()
@@ -421,11 +421,11 @@ async def cancel_production_batch(
         raise HTTPException(status_code=404, detail="Production batch not found")
     
     # Check if batch can be cancelled
-    if db_batch.status == "completed":
+    if db_batch.status == models_inventory.ProductionBatchStatus.COMPLETED:
         raise HTTPException(status_code=400, detail="Completed batches cannot be cancelled")
     
     # If batch is in progress, return raw materials
-    if db_batch.status == "in_progress":
+    if db_batch.status == models_inventory.ProductionBatchStatus.IN_PROGRESS:
         # Get BOM items
         bom_items = db.query(models_inventory.BillOfMaterialItem).filter(models_inventory.BillOfMaterialItem.bom_id == db_batch.bom_id).all()
         
@@ -455,7 +455,7 @@ async def cancel_production_batch(
             inventory_item.current_stock += required_qty
     
     # Update batch status
-    db_batch.status = "cancelled"
+    db_batch.status = models_inventory.ProductionBatchStatus.CANCELLED
     db_batch.notes = (db_batch.notes or "") + f"\nCancelled: {notes}"
     
     db.commit()
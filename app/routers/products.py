@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, asc, or_, and_
+from sqlalchemy.orm import Session, undefer_group
+from sqlalchemy import func, desc, asc, or_, and_, select, bindparam
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import json
@@ -14,6 +14,20 @@ from fastapi.encoders import jsonable_encoder
 
 router = APIRouter()
 
+# Built once at import with bindparam placeholders: the statement's
+# compilation-cache key stays identical across requests, so the ORM's
+# compile step only ever runs once for these hot lookups
+_PRODUCT_BY_ID = (
+    select(models.Product)
+    .options(undefer_group("content"))
+    .where(models.Product.id == bindparam("product_id"))
+)
+_PRODUCT_BY_SLUG = (
+    select(models.Product)
+    .options(undefer_group("content"))
+    .where(models.Product.slug == bindparam("slug"))
+)
+
 def generate_slug(name: str) -> str:
     """Generate a URL-friendly slug from a product name"""
     return name.lower().replace(" ", "-")
@@ -81,9 +95,9 @@ async def create_product(
         tax_rate=product.tax_rate,      # Add tax_rate
         is_tax_inclusive=product.is_tax_inclusive,  # Add is_tax_inclusive
         stock_quantity=product.stock_quantity,
-        image_urls=json.dumps(product.image_urls),
+        image_urls=product.image_urls,
         seller_id=current_user.id,
-        gst_details=json.dumps(gst_details) if gst_details else None,
+        gst_details=gst_details if gst_details else None,
         approval_status=models.ApprovalStatus.PENDING if current_user.role == models.UserRole.SELLER else models.ApprovalStatus.APPROVED,
         approved_by=None if current_user.role == models.UserRole.SELLER else current_user.id
     )
@@ -136,7 +150,9 @@ def read_products(
     size: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(models.Product).filter(models.Product.approval_status == models.ApprovalStatus.APPROVED)
+    # Listings render the content blobs, so load them up front rather
+    # than one deferred-group query per row
+    query = db.query(models.Product).options(undefer_group("content")).filter(models.Product.approval_status == models.ApprovalStatus.APPROVED)
 
     # Apply category filter if provided
     if category_id:
@@ -185,15 +201,18 @@ def read_products(
     # First convert all products to dictionaries
     for product in products:
         product_dict = jsonable_encoder(product)
+        # Hybrid flag fields live on the bitmask, not the instance dict
+        product_dict.update(product.flag_values())
 
         # Now modify the dictionary fields as needed
-        if product.image_urls:
+        if isinstance(product.image_urls, str):
+            # Legacy rows written before the JSONB migration
             try:
                 product_dict["image_urls"] = json.loads(product.image_urls)
             except:
                 product_dict["image_urls"] = []
         else:
-            product_dict["image_urls"] = []
+            product_dict["image_urls"] = product.image_urls or []
 
         # Handle gst_details
         if product.gst_details and isinstance(product.gst_details, str):
@@ -256,7 +275,7 @@ async def search_products(
     db: Session = Depends(get_db)
 ):
     # Start with base query for approved products
-    db_query = db.query(models.Product).filter(models.Product.approval_status == models.ApprovalStatus.APPROVED)
+    db_query = db.query(models.Product).options(undefer_group("content")).filter(models.Product.approval_status == models.ApprovalStatus.APPROVED)
     
     # Apply search filters
     search_filter = or_(
@@ -341,7 +360,7 @@ async def search_products(
 async def read_product(product_id: int, db: Session = Depends(get_db)):
     # Invalidate the cache for this product to ensure we get fresh data
     product_dict = {}
-    product = db.query(models.Product).filter(models.Product.id == product_id).first()
+    product = db.scalars(_PRODUCT_BY_ID, {"product_id": product_id}).first()
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -351,14 +370,14 @@ async def read_product(product_id: int, db: Session = Depends(get_db)):
         if current_user.id != product.seller_id and current_user.role not in [models.UserRole.ADMIN, models.UserRole.COMPANY]:
             raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    # Parse image_urls from JSON string to list
-    if product.image_urls:
+    # JSONB rows arrive as lists; tolerate legacy JSON strings
+    if isinstance(product.image_urls, str):
         try:
             product_dict["image_urls"] = json.loads(product.image_urls)
         except:
             product_dict["image_urls"] = []
     else:
-        product_dict["image_urls"] = []
+        product_dict["image_urls"] = product.image_urls or []
 
     # Handle gst_details
     if product.gst_details and isinstance(product.gst_details, str):
@@ -400,7 +419,9 @@ async def read_product(product_id: int, db: Session = Depends(get_db)):
     if product.categories:
         # Use jsonable_encoder on each category to ensure all fields are included
         product_dict["categories"] = [jsonable_encoder(cat) for cat in product.categories]
-    return jsonable_encoder(product)
+    encoded = jsonable_encoder(product)
+    encoded.update(product.flag_values())
+    return encoded
 
 
 @router.get("/detail-content/{slug}")
@@ -408,7 +429,7 @@ async def get_product_detail_content_by_slug(
     slug: str,
     db: Session = Depends(get_db)
 ):
-    product = db.query(models.Product).filter(models.Product.slug == slug).first()
+    product = db.scalars(_PRODUCT_BY_SLUG, {"slug": slug}).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
@@ -427,7 +448,7 @@ async def update_product(
     current_user: schemas.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    db_product = db.query(models.Product).filter(models.Product.id == product_id).first()
+    db_product = db.scalars(_PRODUCT_BY_ID, {"product_id": product_id}).first()
     if db_product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -461,8 +482,7 @@ async def update_product(
         db_product.stock_quantity = product_update.stock_quantity
     
     if product_update.image_urls is not None:
-        # Store as JSON string but ensure it's properly serialized
-        db_product.image_urls = json.dumps(product_update.image_urls)
+        db_product.image_urls = product_update.image_urls
     
     # Initialize gst_details if it doesn't exist
     if db_product.gst_details is None:
@@ -495,10 +515,6 @@ async def update_product(
         else:
             db_product.gst_details = {'specifications': product_update.specifications}
             
-    # Ensure gst_details is stored as JSON
-    if isinstance(db_product.gst_details, dict):
-        db_product.gst_details = json.dumps(db_product.gst_details)
-    
     # Only admins and company personnel can update approval status
     if product_update.approval_status is not None and current_user.role in [models.UserRole.ADMIN, models.UserRole.COMPANY]:
         db_product.approval_status = product_update.approval_status
@@ -551,7 +567,7 @@ async def delete_product(
     current_user: schemas.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    db_product = db.query(models.Product).filter(models.Product.id == product_id).first()
+    db_product = db.scalars(_PRODUCT_BY_ID, {"product_id": product_id}).first()
     if db_product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -577,7 +593,7 @@ async def delete_product(
 @router.get("/by-slug/{slug}/nutritional-details", response_model=schemas.ProductNutritionalDetailResponse)
 def get_product_nutritional_details_by_slug(slug: str, db: Session = Depends(get_db)):
     """Get a product's nutritional details by its slug."""
-    product = db.query(models.Product).filter(models.Product.slug == slug).first()
+    product = db.scalars(_PRODUCT_BY_SLUG, {"slug": slug}).first()
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
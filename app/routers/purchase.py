@@ -199,7 +199,7 @@ async def create_purchase_indent(
 async def read_purchase_indents(
     skip: int = 0,
     limit: int = 100,
-    status: Optional[str] = None,
+    status: Optional[schemas_inventory.PurchaseIndentStatus] = None,
     requested_by: Optional[int] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
@@ -249,11 +249,11 @@ async def approve_purchase_indent(
         raise HTTPException(status_code=404, detail="Purchase indent not found")
     
     # Check if indent is in pending status
-    if db_indent.status != "pending":
+    if db_indent.status != models_inventory.PurchaseIndentStatus.PENDING:
         raise HTTPException(status_code=400, detail="Only pending indents can be approved")
     
     # Update indent status
-    db_indent.status = "approved"
+    db_indent.status = models_inventory.PurchaseIndentStatus.APPROVED
     db_indent.approved_by = current_user.id
     db_indent.approved_at = datetime.now()
     
@@ -274,11 +274,11 @@ async def reject_purchase_indent(
         raise HTTPException(status_code=404, detail="Purchase indent not found")
     
     # Check if indent is in pending status
-    if db_indent.status != "pending":
+    if db_indent.status != models_inventory.PurchaseIndentStatus.PENDING:
         raise HTTPException(status_code=400, detail="Only pending indents can be rejected")
     
     # Update indent status
-    db_indent.status = "rejected"
+    db_indent.status = models_inventory.PurchaseIndentStatus.REJECTED
     db_indent.approved_by = current_user.id
     db_indent.approved_at = datetime.now()
     db_indent.notes = notes
@@ -307,7 +307,7 @@ async def create_purchase_order(
             raise HTTPException(status_code=404, detail="Purchase indent not found")
         
         # Check if indent is approved
-        if indent.status != "approved":
+        if indent.status != models_inventory.PurchaseIndentStatus.APPROVED:
             raise HTTPException(status_code=400, detail="Purchase indent must be approved before creating a purchase order")
     
     # Generate PO number
@@ -557,7 +557,7 @@ async def create_purchase_receipt(
         db.add(db_receipt_item)
         
         # Update PO item received quantity
-        po_item.received_quantity += item.received_quantity
+        po_item.received_quantity += Decimal(str(item.received_quantity))
         
         # Check if all items are fully received
         if po_item.received_quantity < po_item.quantity:
@@ -570,7 +570,7 @@ async def create_purchase_receipt(
                 movement_type=schemas_inventory.StockMovementType.PURCHASE,
                 quantity=item.accepted_quantity,
                 unit_price=po_item.unit_price,
-                total_value=po_item.unit_price * item.accepted_quantity,
+                total_value=po_item.unit_price * Decimal(str(item.accepted_quantity)),
                 reference_number=po.po_number,
                 reference_type="purchase_order",
                 reference_id=po.id,
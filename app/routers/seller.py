@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer_group
 from sqlalchemy import func, desc, asc
 from typing import List, Optional
 import json
@@ -140,7 +140,7 @@ async def seller_dashboard(
             "id": product.id,
             "name": product.name,
             "sku": product.sku,
-            "image": json.loads(product.image_urls)[0] if product.image_urls else None,
+            "image": product.image_urls[0] if product.image_urls else None,
             "total_sold": total_sold,
             "total_revenue": total_revenue
         })
@@ -185,7 +185,7 @@ async def get_seller_products(
     db: Session = Depends(get_db)
 ):
     # Base query
-    query = db.query(models.Product).filter(models.Product.seller_id == current_user.id)
+    query = db.query(models.Product).options(undefer_group("content")).filter(models.Product.seller_id == current_user.id)
     
     # Apply filters
     if search:
@@ -261,9 +261,6 @@ async def create_product(
     current_user: schemas.User = Depends(get_seller_user),
     db: Session = Depends(get_db)
 ):
-    # Convert image_urls list to JSON string
-    image_urls_json = json.dumps(product.image_urls)
-    
     # Create product
     db_product = models.Product(
         name=product.name,
@@ -272,7 +269,7 @@ async def create_product(
         description=product.description,
         price=product.price,
         stock_quantity=product.stock_quantity,
-        image_urls=image_urls_json,
+        image_urls=product.image_urls,
         seller_id=current_user.id,
         approval_status=models.ApprovalStatus.PENDING
     )
@@ -323,7 +320,7 @@ async def update_product(
         db_product.stock_quantity = product_update.stock_quantity
     
     if product_update.image_urls is not None:
-        db_product.image_urls = json.dumps(product_update.image_urls)
+        db_product.image_urls = product_update.image_urls
     
     # Reset approval status when product is updated
     db_product.approval_status = models.ApprovalStatus.PENDING
@@ -580,7 +577,7 @@ async def get_seller_products(
     db: Session = Depends(get_db)
 ):
     # Base query for seller's products
-    query = db.query(models.Product).filter(models.Product.seller_id == current_user.id)
+    query = db.query(models.Product).options(undefer_group("content")).filter(models.Product.seller_id == current_user.id)
     
     # Apply filters
     if search:
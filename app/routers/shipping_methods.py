@@ -1,25 +1,58 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import event
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
-from ..database import get_db
+from ..database import get_db, _session_scope
+from ..cache import cached_l1_l2, invalidate_reference_data_cache
 from ..models import ShippingMethod, User
 from ..schemas import ShippingMethodBase, ShippingMethod as ShippingMethodSchema
 from .auth import get_current_active_user, get_admin_user
 
 router = APIRouter()
 
+# Shipping methods are a handful of rows read on every checkout; serve
+# the active set from the L1/Redis cache and invalidate on admin writes
+@cached_l1_l2(expire=300, key_prefix="shipping")
+def get_active_shipping_methods() -> List[dict]:
+    with _session_scope() as db:
+        rows = db.query(ShippingMethod).filter(ShippingMethod.is_active == True).all()
+        return [
+            {
+                "id": row.id,
+                "name": row.name,
+                "description": row.description,
+                "price": float(row.price),
+                "estimated_days": row.estimated_days,
+                "is_active": row.is_active,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+            }
+            for row in rows
+        ]
+
+def get_active_shipping_method(shipping_method_id: int) -> Optional[dict]:
+    """Resolve one active shipping method from the cached set."""
+    for method in get_active_shipping_methods():
+        if method["id"] == shipping_method_id:
+            return method
+    return None
+
+@event.listens_for(ShippingMethod, "after_insert")
+@event.listens_for(ShippingMethod, "after_update")
+@event.listens_for(ShippingMethod, "after_delete")
+def _invalidate_shipping_methods(mapper, connection, target):
+    invalidate_reference_data_cache("shipping")
+
 @router.get("/", response_model=List[ShippingMethodSchema], status_code=status.HTTP_200_OK)
 async def get_shipping_methods(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all available shipping methods"""
-    # Get all active shipping methods from the database
-    print(current_user.id)
-    shipping_methods = db.query(ShippingMethod).filter(ShippingMethod.is_active == True).all()
-    return shipping_methods
+    # Served from the reference-data cache; DB only on a cold miss
+    return get_active_shipping_methods()
 
 @router.get("/{shipping_method_id}", response_model=ShippingMethodSchema)
 async def get_shipping_method(
@@ -27,10 +60,7 @@ async def get_shipping_method(
     db: Session = Depends(get_db)
 ):
     """Get a specific shipping method by ID"""
-    shipping_method = db.query(ShippingMethod).filter(
-        ShippingMethod.id == shipping_method_id,
-        ShippingMethod.is_active == True
-    ).first()
+    shipping_method = get_active_shipping_method(shipping_method_id)
     
     if not shipping_method:
         raise HTTPException(status_code=404, detail="Shipping method not found")
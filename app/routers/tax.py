@@ -1,15 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, asc
+from sqlalchemy import event, func, desc, asc
 from typing import List, Optional, Dict
 from datetime import datetime
+from decimal import Decimal
 
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_db, _session_scope
+from ..cache import cached_l1_l2, invalidate_reference_data_cache
 from .auth import get_current_active_user
 
 router = APIRouter()
 
+# tax_rates and margin_settings are tiny tables read on every checkout;
+# serve them from the L1/Redis cache as plain dicts so tax calculation
+# costs no DB round-trip. Write events below invalidate on change.
+@cached_l1_l2(expire=300, key_prefix="taxrates")
+def get_active_tax_rates() -> List[Dict]:
+    with _session_scope() as db:
+        rows = db.query(models.TaxRate).filter(models.TaxRate.is_active == True).all()
+        return [
+            {
+                "id": row.id,
+                "category_id": row.category_id,
+                "region": row.region,
+                "rate": float(row.rate),
+                "tax_type": row.tax_type.value if row.tax_type else None,
+            }
+            for row in rows
+        ]
+
+@cached_l1_l2(expire=300, key_prefix="margins")
+def get_active_margin_settings() -> List[Dict]:
+    with _session_scope() as db:
+        rows = db.query(models.MarginSetting).filter(models.MarginSetting.is_active == True).all()
+        return [
+            {
+                "id": row.id,
+                "category_id": row.category_id,
+                "region": row.region,
+                "margin_percentage": float(row.margin_percentage),
+            }
+            for row in rows
+        ]
+
+@event.listens_for(models.TaxRate, "after_insert")
+@event.listens_for(models.TaxRate, "after_update")
+@event.listens_for(models.TaxRate, "after_delete")
+def _invalidate_tax_rates(mapper, connection, target):
+    invalidate_reference_data_cache("taxrates")
+
+@event.listens_for(models.MarginSetting, "after_insert")
+@event.listens_for(models.MarginSetting, "after_update")
+@event.listens_for(models.MarginSetting, "after_delete")
+def _invalidate_margins(mapper, connection, target):
+    invalidate_reference_data_cache("margins")
+
 # Helper function to check admin permissions
 async def get_admin_user(current_user: schemas.User = Depends(get_current_active_user)):
     if current_user.role != models.UserRole.ADMIN:
@@ -371,35 +417,30 @@ async def calculate_tax(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Get applicable tax rate
+    # Get applicable tax rate from the cached active set (no DB hit)
+    rates = get_active_tax_rates()
     tax_rate = None
     
     # Try to find category-specific tax rate
     if product.categories:
-        category_ids = [category.id for category in product.categories]
-        tax_rate = db.query(models.TaxRate).filter(
-            models.TaxRate.is_active == True,
-            models.TaxRate.category_id.in_(category_ids)
-        ).first()
+        category_ids = {category.id for category in product.categories}
+        tax_rate = next((r for r in rates if r["category_id"] in category_ids), None)
     
     # If not found, try to find region-specific tax rate
     if not tax_rate and tax_request.region:
-        tax_rate = db.query(models.TaxRate).filter(
-            models.TaxRate.is_active == True,
-            models.TaxRate.region == tax_request.region
-        ).first()
+        tax_rate = next((r for r in rates if r["region"] == tax_request.region), None)
     
     # If still not found, use default tax rate
     if not tax_rate:
-        tax_rate = db.query(models.TaxRate).filter(
-            models.TaxRate.is_active == True,
-            models.TaxRate.category_id == None,
-            models.TaxRate.region == None
-        ).first()
+        tax_rate = next(
+            (r for r in rates if r["category_id"] is None and r["region"] is None), None
+        )
     
     # Calculate tax
     base_price = product.price
-    tax_percentage = tax_rate.rate if tax_rate else product.tax_rate
+    # Cached rates are floats (JSON round-trip); convert so the math
+    # below stays within Decimal alongside the Numeric product price
+    tax_percentage = Decimal(str(tax_rate["rate"])) if tax_rate else product.tax_rate
     
     # Check if price is tax inclusive
     if product.is_tax_inclusive:
@@ -418,7 +459,7 @@ async def calculate_tax(
     sgst_amount = 0
     igst_amount = 0
     
-    if tax_rate and tax_rate.tax_type == models.TaxType.GST:
+    if tax_rate and tax_rate["tax_type"] == models.TaxType.GST.value:
         # For same state (CGST + SGST)
         if tax_request.buyer_state == tax_request.seller_state:
             cgst_amount = tax_amount / 2
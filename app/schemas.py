@@ -1328,8 +1328,8 @@ class ProductNutritionalDetailUpdate(ProductNutritionalDetailBase):
 class ProductNutritionalDetailInDB(ProductNutritionalDetailBase):
     id: int
     product_id: int
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
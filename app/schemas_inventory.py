@@ -34,6 +34,19 @@ class PurchaseOrderStatus(str, Enum):
     RECEIVED = "received"
     CANCELLED = "cancelled"
 
+class ProductionBatchStatus(str, Enum):
+    PLANNED = "planned"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+class PurchaseIndentStatus(str, Enum):
+    DRAFT = "draft"
+    PENDING = "pending"
+    APPROVED = "approved"
+    REJECTED = "rejected"
+    CLOSED = "closed"
+
 class GatePassType(str, Enum):
     INWARD = "inward"
     OUTWARD = "outward"
@@ -233,7 +246,7 @@ class ProductionBatchBase(BaseModel):
     bom_id: int
     planned_quantity: int
     production_date: date
-    status: str
+    status: ProductionBatchStatus
     notes: Optional[str] = None
 
 class ProductionBatchCreate(ProductionBatchBase):
@@ -313,7 +326,7 @@ class PurchaseIndentBase(BaseModel):
     department: Optional[str] = None
     request_date: date
     required_by_date: Optional[date] = None
-    status: str
+    status: PurchaseIndentStatus
     notes: Optional[str] = None
 
 class PurchaseIndentCreate(PurchaseIndentBase):
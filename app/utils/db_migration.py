@@ -8,15 +8,16 @@ from sqlalchemy import text
 # Add the parent directory to sys.path to import app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from app.database import SessionLocal, engine
+from app.database import SessionLocal, engine, create_all_if_not_exists
 from app import models, models_inventory
 
 def create_tables():
     """Create all tables if they don't exist."""
     print("Creating tables if they don't exist...")
-    # Create tables from both model files
-    models.Base.metadata.create_all(bind=engine)
-    models_inventory.Base.metadata.create_all(bind=engine)
+    # Batched IF NOT EXISTS DDL avoids create_all's per-table
+    # existence probe round-trips
+    create_all_if_not_exists(models.Base.metadata)
+    create_all_if_not_exists(models_inventory.Base.metadata)
     print("Tables created or already exist")
 
 def run_migration():
@@ -101,12 +102,540 @@ def run_migration():
         else:
             print("purchase_receipt_id column already exists in stock_movements table")
             
+        # Convert legacy json columns to jsonb (binary storage: no
+        # reparse on read, containment operators become indexable).
+        # ALTER is a no-op rewrite when the column is already jsonb.
+        json_to_jsonb = [
+            ("users", "bank_details"), ("users", "meta_data"),
+            ("blogs", "tags"),
+            ("payment_methods", "payment_metadata"),
+            ("products", "gst_details"), ("products", "features"),
+            ("products", "specifications"),
+            ("testimonials", "meta_data"),
+            ("documents", "doc_metadata"),
+            ("invoices", "invoice_metadata"),
+            ("order_items", "gst_details"),
+            ("payments", "gateway_response"), ("payments", "payment_metadata"),
+            ("transactions", "gateway_response"), ("transactions", "transaction_metadata"),
+            ("logistics_providers", "service_areas"),
+            ("logistics_providers", "service_types"),
+            ("logistics_providers", "pricing_tiers"),
+            ("shipments", "dimensions"),
+            ("shipments", "pickup_address"), ("shipments", "delivery_address"),
+        ]
+        print("Converting json columns to jsonb...")
+        convert_sql = ";\n".join(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb"
+            for table, column in json_to_jsonb
+        )
+        db.execute(text(convert_sql))
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_blogs_tags_gin
+                ON blogs USING gin (tags jsonb_path_ops);
+            CREATE INDEX IF NOT EXISTS ix_products_specifications_gin
+                ON products USING gin (specifications jsonb_path_ops);
+            CREATE INDEX IF NOT EXISTS ix_payments_gateway_response_gin
+                ON payments USING gin (gateway_response jsonb_path_ops);
+            CREATE INDEX IF NOT EXISTS ix_logistics_providers_service_areas_gin
+                ON logistics_providers USING gin (service_areas jsonb_path_ops)
+        """))
+        db.commit()
+        print("json columns converted to jsonb")
+
+        # Convert legacy text-as-JSON columns to jsonb. Some historical
+        # rows were written via str(dict) and aren't valid JSON, so a
+        # tolerant cast wraps anything unparseable as a JSON string
+        # instead of aborting the migration.
+        print("Converting text-as-JSON columns to jsonb...")
+        db.execute(text("""
+            CREATE OR REPLACE FUNCTION pg_temp.try_jsonb(t text) RETURNS jsonb AS $$
+            BEGIN
+                RETURN t::jsonb;
+            EXCEPTION WHEN others THEN
+                RETURN to_jsonb(t);
+            END $$ LANGUAGE plpgsql IMMUTABLE
+        """))
+        text_to_jsonb = [
+            ("products", "image_urls"),
+            ("users", "business_address"),
+            ("orders", "payment_details"),
+            ("orders", "shipping_address"), ("orders", "billing_address"),
+            ("invoices", "billing_address"), ("invoices", "shipping_address"),
+        ]
+        db.execute(text(";\n".join(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE jsonb USING pg_temp.try_jsonb({column})"
+            for table, column in text_to_jsonb
+        )))
+        db.commit()
+        print("text-as-JSON columns converted to jsonb")
+
+        # Indexes for frequently filtered status columns
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_orders_status ON orders (status);
+            CREATE INDEX IF NOT EXISTS ix_orders_payment_status ON orders (payment_status);
+            CREATE INDEX IF NOT EXISTS ix_products_approval_status ON products (approval_status)
+        """))
+        db.commit()
+
+        # Pack the six product marketing booleans into one smallint
+        # bitmask (bit order matches _PRODUCT_FLAG_BITS in app.models),
+        # then drop the old columns. Guarded so reruns are no-ops.
+        print("Packing product flag columns into flags bitmask...")
+        db.execute(text("""
+            ALTER TABLE products ADD COLUMN IF NOT EXISTS flags smallint NOT NULL DEFAULT 0;
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'products' AND column_name = 'is_bestseller') THEN
+                    UPDATE products SET flags =
+                          COALESCE(is_bestseller, false)::int
+                        | (COALESCE(is_new, false)::int << 1)
+                        | (COALESCE(is_featured, false)::int << 2)
+                        | (COALESCE(is_top_seller, false)::int << 3)
+                        | (COALESCE(is_top_product, false)::int << 4)
+                        | (COALESCE(is_popular, false)::int << 5);
+                    ALTER TABLE products
+                        DROP COLUMN is_bestseller,
+                        DROP COLUMN is_new,
+                        DROP COLUMN is_featured,
+                        DROP COLUMN is_top_seller,
+                        DROP COLUMN is_top_product,
+                        DROP COLUMN is_popular;
+                END IF;
+            END $$;
+            CREATE INDEX IF NOT EXISTS ix_products_featured
+                ON products (id) WHERE (flags & 4) <> 0;
+            CREATE INDEX IF NOT EXISTS ix_products_bestseller
+                ON products (id) WHERE (flags & 1) <> 0
+        """))
+        db.commit()
+        print("Product flags packed")
+
+        # Address FKs on orders/invoices: listings join user_addresses
+        # instead of parsing the JSONB snapshots. Nullable — historical
+        # rows keep only the snapshot.
+        db.execute(text("""
+            ALTER TABLE orders
+                ADD COLUMN IF NOT EXISTS shipping_address_id INTEGER REFERENCES user_addresses(id),
+                ADD COLUMN IF NOT EXISTS billing_address_id INTEGER REFERENCES user_addresses(id);
+            ALTER TABLE invoices
+                ADD COLUMN IF NOT EXISTS shipping_address_id INTEGER REFERENCES user_addresses(id),
+                ADD COLUMN IF NOT EXISTS billing_address_id INTEGER REFERENCES user_addresses(id)
+        """))
+        db.commit()
+
+        # Money columns the generated totals depend on convert to
+        # numeric first: Postgres refuses to ALTER the type of a column
+        # referenced by a generated column, so price/unit_price/... must
+        # already be numeric before the totals become generated below.
+        # Guarded on data_type so reruns skip past without touching the
+        # dependency again.
+        print("Converting line-item money columns to numeric...")
+        db.execute(text("""
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'order_items' AND column_name = 'price'
+                             AND data_type <> 'numeric') THEN
+                    ALTER TABLE order_items
+                        ALTER COLUMN price TYPE numeric(12,2),
+                        ALTER COLUMN tax_amount TYPE numeric(12,2);
+                END IF;
+                IF EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'invoice_line_items' AND column_name = 'unit_price'
+                             AND data_type <> 'numeric') THEN
+                    ALTER TABLE invoice_line_items
+                        ALTER COLUMN unit_price TYPE numeric(12,2),
+                        ALTER COLUMN tax_rate TYPE numeric(5,2),
+                        ALTER COLUMN tax_amount TYPE numeric(12,2),
+                        ALTER COLUMN discount_amount TYPE numeric(12,2);
+                END IF;
+            END $$
+        """))
+        db.commit()
+        print("Line-item money columns converted to numeric")
+
+        # Convert line totals to GENERATED ALWAYS STORED columns so the
+        # server keeps them in sync with price/quantity. Guarded on
+        # is_generated so reruns are no-ops; ADD COLUMN backfills every
+        # existing row from the expression and creates it as
+        # numeric(12,2) directly. Runs before the covering index below,
+        # which references order_items.total.
+        print("Converting line totals to generated columns...")
+        db.execute(text("""
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'order_items' AND column_name = 'total'
+                             AND is_generated = 'NEVER') THEN
+                    ALTER TABLE order_items DROP COLUMN total;
+                    ALTER TABLE order_items ADD COLUMN total numeric(12, 2)
+                        GENERATED ALWAYS AS (price * quantity) STORED;
+                END IF;
+                IF EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'invoice_line_items' AND column_name = 'total'
+                             AND is_generated = 'NEVER') THEN
+                    ALTER TABLE invoice_line_items DROP COLUMN total;
+                    ALTER TABLE invoice_line_items ADD COLUMN total numeric(12, 2)
+                        GENERATED ALWAYS AS ((unit_price * quantity) + tax_amount - discount_amount) STORED;
+                END IF;
+            END $$
+        """))
+        db.commit()
+        print("Line totals converted to generated columns")
+
+        # Composite/covering indexes for the hot query shapes
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_cart_items_user_product
+                ON cart_items (user_id, product_id);
+            CREATE INDEX IF NOT EXISTS ix_order_items_order_product
+                ON order_items (order_id, product_id) INCLUDE (quantity, price, total);
+            CREATE INDEX IF NOT EXISTS ix_payments_user_status
+                ON payments (user_id, status);
+            CREATE INDEX IF NOT EXISTS ix_invoices_user_status
+                ON invoices (user_id, status);
+            CREATE INDEX IF NOT EXISTS ix_tax_rates_lookup
+                ON tax_rates (category_id, region, is_active)
+        """))
+        db.commit()
+
+        # Bound identifier columns; fixed-format statutory codes become
+        # CHAR. Bounds are generous relative to the data the app writes,
+        # so the ALTERs are metadata-only for conforming rows.
+        print("Bounding identifier column types...")
+        db.execute(text("""
+            ALTER TABLE products
+                ALTER COLUMN slug TYPE varchar(200),
+                ALTER COLUMN sku TYPE varchar(64),
+                ALTER COLUMN hsn_code TYPE varchar(8);
+            ALTER TABLE users
+                ALTER COLUMN email TYPE varchar(254),
+                ALTER COLUMN username TYPE varchar(64),
+                ALTER COLUMN phone TYPE varchar(20),
+                ALTER COLUMN gst_number TYPE char(15),
+                ALTER COLUMN pan_number TYPE char(10);
+            ALTER TABLE orders
+                ALTER COLUMN order_number TYPE varchar(32),
+                ALTER COLUMN invoice_number TYPE varchar(32);
+            ALTER TABLE invoices
+                ALTER COLUMN invoice_number TYPE varchar(32);
+            ALTER TABLE invoice_line_items
+                ALTER COLUMN hsn_code TYPE varchar(8);
+            ALTER TABLE payments
+                ALTER COLUMN payment_reference TYPE varchar(64),
+                ALTER COLUMN currency TYPE char(3);
+            ALTER TABLE transactions
+                ALTER COLUMN transaction_reference TYPE varchar(64),
+                ALTER COLUMN currency TYPE char(3)
+        """))
+        db.commit()
+        print("Identifier columns bounded")
+
+        # Money columns move from double precision to numeric(12,2)
+        # (exact, no FP rounding in tax/total arithmetic); percentage
+        # rates get numeric(5,2). Values are rounded to paise by the
+        # implicit cast. order_items and invoice_line_items were handled
+        # before the generated-column conversion above.
+        print("Converting money columns to numeric...")
+        db.execute(text("""
+            ALTER TABLE products
+                ALTER COLUMN base_price TYPE numeric(12,2),
+                ALTER COLUMN price TYPE numeric(12,2),
+                ALTER COLUMN tax_rate TYPE numeric(5,2);
+            ALTER TABLE orders
+                ALTER COLUMN subtotal_amount TYPE numeric(12,2),
+                ALTER COLUMN total_amount TYPE numeric(12,2),
+                ALTER COLUMN tax_amount TYPE numeric(12,2),
+                ALTER COLUMN cgst_amount TYPE numeric(12,2),
+                ALTER COLUMN sgst_amount TYPE numeric(12,2),
+                ALTER COLUMN igst_amount TYPE numeric(12,2),
+                ALTER COLUMN shipping_amount TYPE numeric(12,2),
+                ALTER COLUMN discount_amount TYPE numeric(12,2);
+            ALTER TABLE tax_rates
+                ALTER COLUMN rate TYPE numeric(5,2);
+            ALTER TABLE margin_settings
+                ALTER COLUMN margin_percentage TYPE numeric(5,2);
+            ALTER TABLE payments
+                ALTER COLUMN amount TYPE numeric(12,2),
+                ALTER COLUMN refunded_amount TYPE numeric(12,2);
+            ALTER TABLE installment_plans
+                ALTER COLUMN total_amount TYPE numeric(12,2),
+                ALTER COLUMN interest_rate TYPE numeric(5,2),
+                ALTER COLUMN processing_fee TYPE numeric(12,2);
+            ALTER TABLE transactions
+                ALTER COLUMN amount TYPE numeric(12,2);
+            ALTER TABLE invoices
+                ALTER COLUMN subtotal TYPE numeric(12,2),
+                ALTER COLUMN tax_amount TYPE numeric(12,2),
+                ALTER COLUMN cgst_amount TYPE numeric(12,2),
+                ALTER COLUMN sgst_amount TYPE numeric(12,2),
+                ALTER COLUMN igst_amount TYPE numeric(12,2),
+                ALTER COLUMN discount_amount TYPE numeric(12,2),
+                ALTER COLUMN shipping_amount TYPE numeric(12,2),
+                ALTER COLUMN adjustment_amount TYPE numeric(12,2),
+                ALTER COLUMN total_amount TYPE numeric(12,2),
+                ALTER COLUMN amount_paid TYPE numeric(12,2),
+                ALTER COLUMN amount_due TYPE numeric(12,2);
+            ALTER TABLE shipping_methods
+                ALTER COLUMN price TYPE numeric(12,2)
+        """))
+        db.commit()
+        print("Money columns converted to numeric")
+
+        # Server-side timestamp defaults: testimonials.date is assigned by
+        # the server (CURRENT_DATE), and the nutritional-detail timestamps
+        # move from ISO-format strings to real timestamptz columns with a
+        # now() default — no per-insert Python callable, one less bind
+        # parameter, and the values become comparable/indexable
+        db.execute(text("""
+            ALTER TABLE testimonials
+                ALTER COLUMN date SET DEFAULT CURRENT_DATE;
+            ALTER TABLE product_nutritional_details
+                ALTER COLUMN created_at TYPE timestamptz
+                    USING created_at::timestamptz,
+                ALTER COLUMN created_at SET DEFAULT now(),
+                ALTER COLUMN updated_at TYPE timestamptz
+                    USING updated_at::timestamptz
+        """))
+        db.commit()
+
+        # Partial indexes for minority-TRUE filters: only matching rows
+        # are indexed, so these stay small enough to live in cache
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_documents_verified
+                ON documents (user_id) WHERE is_verified;
+            CREATE INDEX IF NOT EXISTS ix_certifications_verified
+                ON certifications (user_id) WHERE is_verified;
+            CREATE INDEX IF NOT EXISTS ix_payment_methods_default
+                ON payment_methods (user_id) WHERE is_default AND is_active;
+            CREATE INDEX IF NOT EXISTS ix_blogs_published_date
+                ON blogs (published_date) WHERE status = 'published';
+            CREATE INDEX IF NOT EXISTS ix_shipping_methods_active
+                ON shipping_methods (id) WHERE is_active;
+            CREATE INDEX IF NOT EXISTS ix_testimonials_date_desc
+                ON testimonials (date DESC)
+        """))
+        db.commit()
+
+        # One default address per user, enforced by a unique partial
+        # index. Clear stray duplicates first (keep the newest), then
+        # replace the old non-unique partial index.
+        db.execute(text("""
+            UPDATE user_addresses ua
+               SET is_default = FALSE
+             WHERE ua.is_default AND ua.is_active
+               AND ua.id <> (SELECT max(inner_ua.id)
+                               FROM user_addresses inner_ua
+                              WHERE inner_ua.user_id = ua.user_id
+                                AND inner_ua.is_default
+                                AND inner_ua.is_active);
+            DROP INDEX IF EXISTS ix_user_addresses_default;
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_user_default_addr
+                ON user_addresses (user_id) WHERE is_default AND is_active;
+            CREATE INDEX IF NOT EXISTS ix_user_addresses_user_active
+                ON user_addresses (user_id, is_active, is_default)
+        """))
+        db.commit()
+
+        # Inventory status columns: free-form varchar becomes a native
+        # enum (4-byte storage, invalid states rejected by the type).
+        # Labels are the lowercase strings the rows already hold, so the
+        # USING cast is a direct relabel.
+        db.execute(text("""
+            DO $$
+            BEGIN
+                CREATE TYPE production_batch_status AS ENUM
+                    ('planned', 'in_progress', 'completed', 'cancelled');
+            EXCEPTION WHEN duplicate_object THEN NULL;
+            END $$;
+            DO $$
+            BEGIN
+                CREATE TYPE purchase_indent_status AS ENUM
+                    ('draft', 'pending', 'approved', 'rejected', 'closed');
+            EXCEPTION WHEN duplicate_object THEN NULL;
+            END $$;
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'production_batches'
+                             AND column_name = 'status'
+                             AND data_type <> 'USER-DEFINED') THEN
+                    ALTER TABLE production_batches
+                        ALTER COLUMN status TYPE production_batch_status
+                        USING status::production_batch_status;
+                END IF;
+                IF EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'purchase_indents'
+                             AND column_name = 'status'
+                             AND data_type <> 'USER-DEFINED') THEN
+                    ALTER TABLE purchase_indents
+                        ALTER COLUMN status TYPE purchase_indent_status
+                        USING status::purchase_indent_status;
+                END IF;
+            END $$
+        """))
+        db.commit()
+        print("Inventory status columns converted to native enums")
+
+        # BRIN indexes for the append-only movement tables: timestamps
+        # arrive in order, so block-range summaries prune time-range
+        # scans at a fraction of a btree's size and insert cost
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_stock_movements_performed_brin
+                ON stock_movements USING brin (performed_at)
+                WITH (pages_per_range = 32);
+            CREATE INDEX IF NOT EXISTS ix_packaged_product_movements_performed_brin
+                ON packaged_product_movements USING brin (performed_at)
+                WITH (pages_per_range = 32)
+        """))
+        db.commit()
+
+        # Foreign-key indexes Postgres doesn't create on its own: every
+        # relationship navigation into these child tables was a seq scan
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_stock_movements_inventory_item_id
+                ON stock_movements (inventory_item_id);
+            CREATE INDEX IF NOT EXISTS ix_packaged_product_movements_packaged_product_id
+                ON packaged_product_movements (packaged_product_id);
+            CREATE INDEX IF NOT EXISTS ix_bill_of_material_items_bom_id
+                ON bill_of_material_items (bom_id);
+            CREATE INDEX IF NOT EXISTS ix_bill_of_material_items_inventory_item_id
+                ON bill_of_material_items (inventory_item_id);
+            CREATE INDEX IF NOT EXISTS ix_production_batch_packaging_batch_id
+                ON production_batch_packaging (batch_id);
+            CREATE INDEX IF NOT EXISTS ix_purchase_indent_items_indent_id
+                ON purchase_indent_items (indent_id);
+            CREATE INDEX IF NOT EXISTS ix_purchase_order_items_po_id
+                ON purchase_order_items (po_id);
+            CREATE INDEX IF NOT EXISTS ix_purchase_receipt_items_receipt_id
+                ON purchase_receipt_items (receipt_id);
+            CREATE INDEX IF NOT EXISTS ix_gate_pass_items_gate_pass_id
+                ON gate_pass_items (gate_pass_id);
+            CREATE INDEX IF NOT EXISTS ix_shipments_order_id
+                ON shipments (order_id);
+            CREATE INDEX IF NOT EXISTS ix_shipments_logistics_provider_id
+                ON shipments (logistics_provider_id);
+            CREATE INDEX IF NOT EXISTS ix_delivery_attempts_shipment_id
+                ON delivery_attempts (shipment_id);
+            CREATE INDEX IF NOT EXISTS ix_shipment_tracking_shipment_ts
+                ON shipment_tracking (shipment_id, timestamp)
+        """))
+        db.commit()
+        print("Foreign-key indexes for inventory/logistics tables ready")
+
+        # Money columns in the purchase/shipping models join the numeric
+        # conversion done for the storefront tables earlier: exact cents,
+        # no float drift in SUMs. Weights and dimensions stay float.
+        db.execute(text("""
+            ALTER TABLE inventory_items
+                ALTER COLUMN cost_price TYPE numeric(12,2);
+            ALTER TABLE stock_movements
+                ALTER COLUMN unit_price TYPE numeric(12,2),
+                ALTER COLUMN total_value TYPE numeric(12,2);
+            ALTER TABLE suppliers
+                ALTER COLUMN credit_limit TYPE numeric(12,2);
+            ALTER TABLE purchase_indent_items
+                ALTER COLUMN estimated_price TYPE numeric(12,2);
+            ALTER TABLE purchase_orders
+                ALTER COLUMN subtotal TYPE numeric(12,2),
+                ALTER COLUMN tax_amount TYPE numeric(12,2),
+                ALTER COLUMN shipping_amount TYPE numeric(12,2),
+                ALTER COLUMN discount_amount TYPE numeric(12,2),
+                ALTER COLUMN total_amount TYPE numeric(12,2);
+            ALTER TABLE purchase_order_items
+                ALTER COLUMN unit_price TYPE numeric(12,2),
+                ALTER COLUMN tax_rate TYPE numeric(5,2),
+                ALTER COLUMN tax_amount TYPE numeric(12,2),
+                ALTER COLUMN discount_amount TYPE numeric(12,2),
+                ALTER COLUMN total_amount TYPE numeric(12,2);
+            ALTER TABLE shipments
+                ALTER COLUMN shipping_cost TYPE numeric(12,2),
+                ALTER COLUMN insurance_amount TYPE numeric(12,2)
+        """))
+        db.commit()
+        print("Purchase/shipping money columns converted to numeric")
+
+        # Sales-ranking rollup as a materialized view: the catalog joins
+        # ranking data without writing rollup flags back into products
+        # (no UPDATE amplification, no HOT-chain busting). The unique
+        # index enables REFRESH ... CONCURRENTLY.
+        print("Creating product_rankings materialized view...")
+        db.execute(text("""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS product_rankings AS
+            SELECT oi.product_id AS product_id,
+                   SUM(oi.quantity)::int AS units_sold,
+                   SUM(oi.total)::numeric(14,2) AS revenue,
+                   RANK() OVER (ORDER BY SUM(oi.total) DESC)::int AS sales_rank
+            FROM order_items oi
+            GROUP BY oi.product_id
+            WITH DATA
+        """))
+        db.execute(text("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_product_rankings_product
+                ON product_rankings (product_id)
+        """))
+        db.commit()
+        print("product_rankings materialized view ready")
+
+        # Stock-on-hand rollup from the movement ledger. The CASE mirrors
+        # the sign convention in the inventory router (purchase/return
+        # add, production/sales/wastage subtract, adjustment is signed,
+        # transfer leaves the total unchanged), so dashboards read
+        # O(#items) rows instead of aggregating every movement — and the
+        # figure cannot drift the way InventoryItem.current_stock can.
+        print("Creating mv_current_stock materialized view...")
+        db.execute(text("""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS mv_current_stock AS
+            SELECT sm.inventory_item_id AS inventory_item_id,
+                   SUM(CASE
+                       WHEN sm.movement_type IN ('PURCHASE', 'RETURN')
+                           THEN sm.quantity
+                       WHEN sm.movement_type IN ('PRODUCTION', 'SALES', 'WASTAGE')
+                           THEN -sm.quantity
+                       WHEN sm.movement_type = 'ADJUSTMENT'
+                           THEN sm.quantity
+                       ELSE 0
+                   END)::numeric(12,3) AS quantity
+            FROM stock_movements sm
+            GROUP BY sm.inventory_item_id
+            WITH DATA
+        """))
+        db.execute(text("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_mv_current_stock_item
+                ON mv_current_stock (inventory_item_id)
+        """))
+        db.commit()
+        print("mv_current_stock materialized view ready")
+
         print("Database migration completed successfully!")
     except Exception as e:
-        print(f"Error during migration: {e}")
+        # Surface the failure instead of swallowing it: every block
+        # commits on its own and is idempotent, so after the cause is
+        # fixed a rerun resumes past the steps that already applied.
+        print(f"Error during migration: {e}", file=sys.stderr)
         db.rollback()
+        raise
     finally:
         db.close()
 
+def refresh_product_rankings():
+    """Refresh the product_rankings materialized view.
+
+    CONCURRENTLY keeps the view readable during the rebuild; run this
+    from a scheduler (cron/worker) every few minutes.
+    """
+    # REFRESH ... CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("REFRESH MATERIALIZED VIEW CONCURRENTLY product_rankings")
+
+def refresh_current_stock():
+    """Refresh the mv_current_stock materialized view.
+
+    Same scheduling contract as refresh_product_rankings; CONCURRENTLY
+    keeps stock dashboards readable during the rebuild.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_current_stock")
+
 if __name__ == "__main__":
     run_migration()
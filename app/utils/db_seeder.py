@@ -14,11 +14,11 @@ import string
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from app import models, schemas
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal, engine, Base, create_all_if_not_exists
 from app.utils.slug_generator import generate_slug
 
-# Create all tables if they don't exist
-Base.metadata.create_all(bind=engine)
+# Create all tables if they don't exist (one batched IF NOT EXISTS pass)
+create_all_if_not_exists(Base.metadata)
 
 # Mock product data from frontend
 mock_products = [
@@ -302,13 +302,13 @@ def create_seller_users(db: Session):
                     role=models.UserRole.SELLER,
                     is_active=True,
                     business_name=seller_name,
-                    business_address=json.dumps({
+                    business_address={
                         "street": f"{random.randint(1, 100)} Business Park",
                         "city": location,
                         "state": "Maharashtra" if location == "Mumbai" else "Karnataka" if location == "Bangalore" else "Tamil Nadu" if location == "Chennai" else "Delhi",
                         "postal_code": f"{random.randint(100000, 999999)}",
                         "country": "India"
-                    }),
+                    },
                     gst_number=f"27{random.randint(10000000000, 99999999999)}",
                     region=location
                 )
@@ -432,16 +432,16 @@ def create_products(db: Session, sellers, categories):
                 base_price=product_data["price"] * 0.8,  # 20% margin
                 price=product_data["price"],
                 stock_quantity=random.randint(50, 500),
-                image_urls=json.dumps([product_data["image"]]),
+                image_urls=[product_data["image"]],
                 seller_id=seller.id,
                 hsn_code=f"{random.randint(1000, 9999)}",
                 tax_rate=18.0,  # Default GST rate
                 is_tax_inclusive=False,
-                gst_details=json.dumps({
+                gst_details={
                     "cgst": 9.0,
                     "sgst": 9.0,
                     "igst": 18.0
-                }),
+                },
                 approval_status=models.ApprovalStatus.APPROVED,
                 approved_by=1  # Admin user ID
             )
@@ -497,8 +497,8 @@ def create_orders_and_invoices(db: Session, buyers, products):
                 status=random.choice(list(models.OrderStatus)),
                 payment_status=random.choice(list(models.PaymentStatus)),
                 payment_method=random.choice(["credit_card", "debit_card", "upi", "net_banking"]),
-                shipping_address=json.dumps(address),
-                billing_address=json.dumps(address),
+                shipping_address=address,
+                billing_address=address,
                 shipping_method=random.choice(["standard", "express", "same_day"]),
                 notes="Sample order created by database seeder"
             )
@@ -520,13 +520,12 @@ def create_orders_and_invoices(db: Session, buyers, products):
                     seller_id=product.seller_id,
                     quantity=quantity,
                     price=price,
-                    total=item_total,
                     tax_amount=item_tax,
-                    gst_details=json.dumps({
+                    gst_details={
                         "cgst": item_tax / 2,
                         "sgst": item_tax / 2,
                         "igst": 0
-                    })
+                    }
                 )
                 
                 db.add(order_item)
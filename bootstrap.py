@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Run all schema-bootstrap scripts over a single database connection.
+
+Opening one psycopg2 connection and passing it to each add_* function
+saves a TLS handshake + auth round-trip per script against the remote
+RDS endpoint. With --parallel, the steps instead run concurrently on
+worker threads (each with its own connection), so total wall time is
+the slowest step rather than the sum of all of them.
+"""
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from db_utils import get_conn_params
+from add_blog_tables import add_blog_tables
+from add_product_columns import add_columns
+from add_shipping_methods import add_shipping_methods
+from add_payment_methods import add_default_payment_methods
+
+logger = logging.getLogger(__name__)
+
+# The steps touch disjoint tables, so they can safely run concurrently
+BOOTSTRAP_STEPS = {
+    'blog_tables': add_blog_tables,
+    'product_columns': add_columns,
+    'shipping_methods': add_shipping_methods,
+    'payment_methods': add_default_payment_methods,
+}
+
+
+def bootstrap():
+    """Run all bootstrap steps sequentially, reusing one connection."""
+    conn_params = get_conn_params()
+    logger.info(f"Connecting to database {conn_params['dbname']} on host {conn_params['host']}")
+    conn = psycopg2.connect(**conn_params)
+    try:
+        results = {name: step(conn) for name, step in BOOTSTRAP_STEPS.items()}
+    finally:
+        conn.close()
+
+    return all(results.values())
+
+
+def bootstrap_parallel():
+    """Run all bootstrap steps concurrently, one connection per step.
+
+    Each step opens its own connection on a worker thread; the blocking
+    network waits overlap, cutting wall time to max(step) instead of
+    sum(steps).
+    """
+    with ThreadPoolExecutor(max_workers=len(BOOTSTRAP_STEPS)) as executor:
+        futures = {name: executor.submit(step) for name, step in BOOTSTRAP_STEPS.items()}
+        results = {name: future.result() for name, future in futures.items()}
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Run all schema-bootstrap scripts")
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Run the independent steps concurrently instead of sharing one connection",
+    )
+    args = parser.parse_args()
+
+    success = bootstrap_parallel() if args.parallel else bootstrap()
+    if success:
+        logger.info("Bootstrap completed successfully")
+    else:
+        logger.error("One or more bootstrap steps failed")
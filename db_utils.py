@@ -0,0 +1,48 @@
+"""Shared database-connection helpers for the top-level DDL scripts."""
+import logging
+from functools import lru_cache
+
+import psycopg2
+from psycopg2.extensions import parse_dsn
+
+logger = logging.getLogger(__name__)
+
+# app.database is the single source of truth for the DSN and the pooled
+# engine; a silent fallback here would only mask real config bugs and
+# duplicate credentials in source
+from app.database import DATABASE_URL, engine
+
+
+@lru_cache(maxsize=1)
+def get_conn_params():
+    """Return psycopg2.connect() kwargs parsed from DATABASE_URL.
+
+    Delegates to libpq's own DSN parser via parse_dsn, which handles URL
+    query parameters like sslmode/channel_binding directly — no custom
+    regex to keep in sync. Memoized so a bootstrap runner invoking
+    several DDL scripts parses the URL exactly once.
+    """
+    return parse_dsn(DATABASE_URL)
+
+
+def get_connection():
+    """Return a DBAPI connection for the DDL scripts.
+
+    Checks out from the app engine's QueuePool, so repeated script runs
+    in one process reuse a warm TLS/auth'd socket; closing the returned
+    connection gives it back to the pool.
+
+    The engine's 5s statement_timeout protects API requests but would
+    kill long-running DDL and bulk loads, so it's lifted here — script
+    processes exit when done, so the relaxed session never serves API
+    traffic.
+    """
+    conn = engine.raw_connection()
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SET statement_timeout = 0;"
+            " SET lock_timeout = 0;"
+            " SET idle_in_transaction_session_timeout = 0"
+        )
+    conn.commit()
+    return conn
@@ -0,0 +1,149 @@
+"""Regression tests for Decimal/float mixing on the order money paths.
+
+Product prices and tax rates are Numeric columns and load as Decimal;
+the reference-data caches round-trip through JSON and hand back floats.
+These tests drive the checkout summary and tax calculation with Decimal
+"database" values and float cached values to make sure the handlers
+convert before combining — mixing the two raises TypeError.
+
+Run with: python -m unittest discover tests
+"""
+import asyncio
+import unittest
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from app.routers import checkout, orders, tax
+
+
+class FakeQuery:
+    """Stand-in for Session.query(...): ignores filters, returns rows."""
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    def all(self):
+        return list(self._rows)
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def delete(self, *args, **kwargs):
+        return 0
+
+
+class FakeSession:
+    def __init__(self, rows_by_model):
+        self._rows_by_model = rows_by_model
+
+    def query(self, model):
+        return FakeQuery(self._rows_by_model.get(model, []))
+
+    def add(self, obj):
+        self._rows_by_model.setdefault(type(obj), []).append(obj)
+
+    def flush(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def refresh(self, obj):
+        pass
+
+
+def _product(**overrides):
+    values = dict(
+        id=1,
+        name="Test Product",
+        price=Decimal("100.00"),
+        tax_rate=Decimal("5.00"),
+        is_tax_inclusive=False,
+        categories=[],
+        hsn_code=None,
+        seller_id=1,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class CheckoutSummaryMoneyTest(unittest.TestCase):
+    def test_decimal_cart_with_float_cached_shipping(self):
+        from app import models
+
+        db = FakeSession({
+            models.CartItem: [SimpleNamespace(product_id=1, quantity=2)],
+            models.Product: [_product()],
+        })
+        user = SimpleNamespace(id=1)
+        cached_method = {"id": 1, "name": "Standard", "price": 49.5}
+        with mock.patch.object(
+            checkout, "get_active_shipping_method", return_value=cached_method
+        ):
+            summary = asyncio.run(
+                checkout.get_checkout_summary(
+                    shipping_method_id=1, current_user=user, db=db
+                )
+            )
+        self.assertEqual(summary["subtotal"], Decimal("200.00"))
+        self.assertEqual(summary["tax"], Decimal("10.00"))
+        self.assertEqual(summary["total"], Decimal("259.50"))
+
+
+class CreateOrderMoneyTest(unittest.TestCase):
+    def test_order_totals_combine_decimal_and_cached_shipping(self):
+        from app import models, schemas
+
+        db = FakeSession({
+            models.CartItem: [SimpleNamespace(product_id=1, quantity=2)],
+            models.Product: [_product()],
+            models.UserAddress: [SimpleNamespace(
+                id=1, full_name="A B", address_line1="1 Street",
+                address_line2=None, city="c", state="s", country="in",
+                zip_code="560001", phone_number="9999999999",
+            )],
+            models.PaymentMethod: [SimpleNamespace(id=1, method_type="upi")],
+        })
+        user = SimpleNamespace(id=1)
+        request = schemas.OrderBase(
+            payment_method_id=1, shipping_method_id=1, shipping_address_id=1
+        )
+        cached_method = {"id": 1, "name": "Standard", "price": 49.5}
+        with mock.patch.object(
+            orders, "get_active_shipping_method", return_value=cached_method
+        ), mock.patch.object(orders, "bulk_insert_rows") as bulk:
+            order = asyncio.run(orders.create_order(request, user, db))
+        self.assertEqual(order.subtotal_amount, Decimal("200.00"))
+        self.assertEqual(order.tax_amount, Decimal("10.00"))
+        self.assertEqual(order.total_amount, Decimal("259.50"))
+        self.assertTrue(bulk.called)
+
+
+class CalculateTaxMoneyTest(unittest.TestCase):
+    def test_decimal_price_with_float_cached_rate(self):
+        from app import models, schemas
+
+        db = FakeSession({models.Product: [_product()]})
+        cached_rates = [
+            {"category_id": None, "region": None, "rate": 18.0, "tax_type": "gst"}
+        ]
+        request = schemas.TaxCalculationRequest(
+            product_id=1, quantity=1, buyer_state="KA", seller_state="KA"
+        )
+        with mock.patch.object(
+            tax, "get_active_tax_rates", return_value=cached_rates
+        ):
+            result = asyncio.run(tax.calculate_tax(request, db))
+        self.assertEqual(result["tax_amount"], Decimal("18.00"))
+        self.assertEqual(result["price_with_tax"], Decimal("118.00"))
+        # Same-state GST splits evenly into CGST + SGST
+        self.assertEqual(result["cgst_amount"], Decimal("9.00"))
+        self.assertEqual(result["sgst_amount"], Decimal("9.00"))
+
+
+if __name__ == "__main__":
+    unittest.main()